@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+from pathlib import Path
+
+import ffmpeg
+import numpy as np
+
+SOURCE = "CheeringSFX.mp3"
+OUT_STEM = "cheers"
+RATE = 48000  # Opus only runs at 48 kHz
+
+# Championship buckets: (name, fewest, most, seconds, loudness in dBFS, crowd layers)
+# Bigger buckets get longer, louder and thicker cheers.
+TIERS = [
+    ("0", 0, 0, 0.8, -26.0, 1),
+    ("1-2", 1, 2, 1.0, -22.0, 2),
+    ("3-5", 3, 5, 1.3, -18.0, 3),
+    ("6+", 6, None, 1.6, -15.0, 4),
+]
+SILENCE_DB = -45.0
+PEAK_DB = -1.0
+FADE_IN, FADE_OUT = 0.005, 0.15
+
+# Mono and low bitrate: each tier file is a few KB
+ENCODINGS = {
+    "opus": (".webm", dict(acodec="libopus", audio_bitrate="32k", ac=1, application="audio")),
+    "aac": (".m4a", dict(acodec="aac", audio_bitrate="48k", ac=1, movflags="+faststart")),
+}
+
+
+def read_audio(path, rate=RATE):
+    """Decode to a mono float32 array through a raw PCM pipe."""
+    out, _err = (
+        ffmpeg
+        .input(str(path))
+        .output("pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=rate)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, np.float32)
+
+
+def _db(x):
+    return 20 * np.log10(np.maximum(x, 1e-12))
+
+
+def trim_silence(samples, rate=RATE, threshold=SILENCE_DB, frame=0.01):
+    """Drop everything before the first 10 ms frame louder than threshold."""
+    n = int(rate * frame)
+    frames = samples[: len(samples) // n * n].reshape(-1, n)
+    loud = np.flatnonzero(_db(np.sqrt((frames ** 2).mean(axis=1))) > threshold)
+    return samples[loud[0] * n:] if len(loud) else samples
+
+
+def loudness(samples, rate=RATE, block=0.4):
+    """Gated loudness in dBFS, a simplified BS.1770 without the K-weighting filter.
+
+    Mean square over 400 ms blocks (75% overlap), ignoring blocks below
+    -70 dBFS and then blocks more than 10 dB under the ungated level.
+    """
+    n = int(rate * block)
+    hop = n // 4
+    if len(samples) < n:
+        return float(_db(np.sqrt(np.mean(samples ** 2))))
+    starts = np.arange(0, len(samples) - n + 1, hop)
+    squares = np.concatenate(([0.0], np.cumsum(samples.astype(np.float64) ** 2)))
+    power = (squares[starts + n] - squares[starts]) / n
+    power = power[10 * np.log10(np.maximum(power, 1e-24)) > -70]
+    if not len(power):
+        return -70.0
+    power = power[10 * np.log10(power) > 10 * np.log10(power.mean()) - 10]
+    return float(10 * np.log10(power.mean()))
+
+
+def render_tier(samples, seconds, target_db, layers, rate=RATE):
+    """One cheer: the first `seconds` after the onset, thickened with delayed
+    copies, faded and normalized to target_db (peaks capped at PEAK_DB)."""
+    n = int(seconds * rate)
+    out = np.zeros(n, np.float64)
+    for k in range(layers):
+        # Later layers start a little later and further into the source
+        delay = int(0.043 * k * rate)
+        start = int(0.37 * k * rate)
+        piece = samples[start:start + n - delay]
+        out[delay:delay + len(piece)] += piece * (0.8 ** k)
+
+    ramp_in = int(FADE_IN * rate)
+    ramp_out = int(FADE_OUT * rate)
+    out[:ramp_in] *= np.linspace(0, 1, ramp_in)
+    out[n - ramp_out:] *= np.linspace(1, 0, ramp_out)
+
+    out *= 10 ** ((target_db - loudness(out, rate)) / 20)
+    peak = np.abs(out).max()
+    if peak > 10 ** (PEAK_DB / 20):
+        out *= 10 ** (PEAK_DB / 20) / peak
+    return out.astype(np.float32)
+
+
+def render_tiers(samples, rate=RATE):
+    """[(tier map entry, audio)] for every bucket in TIERS, quietest first."""
+    rendered = []
+    for name, fewest, most, seconds, target_db, layers in TIERS:
+        audio = render_tier(samples, seconds, target_db, layers, rate)
+        rendered.append(({"name": name, "min": fewest, "max": most, "duration": round(len(audio) / rate, 4)}, audio))
+    return rendered
+
+
+def encode(audio, output, options, rate=RATE):
+    """Encode float32 mono samples through stdin, written atomically."""
+    tmp_file = output.with_name(f"{output.stem}.{os.getpid()}.tmp{output.suffix}")
+    (
+        ffmpeg
+        .input("pipe:", format="f32le", ac=1, ar=rate)
+        .output(str(tmp_file), **options)
+        .overwrite_output()
+        .run(input=audio.tobytes(), quiet=True)
+    )
+    tmp_file.replace(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trimmed, loudness-tiered cheers for the bar chart.")
+    parser.add_argument("--source", default=SOURCE)
+    parser.add_argument("--out", default=OUT_STEM,
+                        help="output stem (writes <stem>-<tier>.webm/.m4a and <stem>.json)")
+    args = parser.parse_args(argv)
+
+    samples = trim_silence(read_audio(args.source))
+
+    # One small file per tier, so the page can play the first cheer after
+    # fetching only the quietest one
+    out = Path(args.out)
+    tiers = []
+    for i, (tier, audio) in enumerate(render_tiers(samples)):
+        tier["files"] = {}
+        for codec, (suffix, options) in ENCODINGS.items():
+            output = out.with_name(f"{out.name}-{i}{suffix}")
+            encode(audio, output, options)
+            tier["files"][codec] = output.name
+            print(f"Created {output} ({output.stat().st_size / 1024:.1f} KB)")
+        tiers.append(tier)
+
+    sprite_map = {"tiers": tiers}
+    tmp_file = out.with_name(f"{out.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(sprite_map, indent=2), encoding="utf-8")
+    tmp_file.replace(out.with_suffix(".json"))
+    print(f"Created {out.with_suffix('.json')} ({len(tiers)} tiers)")
+
+
+if __name__ == "__main__":
+    main()
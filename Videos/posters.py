@@ -0,0 +1,103 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import ffmpeg
+import numpy as np
+from PIL import Image
+
+OUT_DIR = Path("posters")
+# Frames are decoded at the #hoverVideo width, a few per second is plenty
+WIDTH = 320
+SAMPLE_FPS = 2
+STRIP_FRAMES = 10
+STRIP_WIDTH = 96
+QUALITY = 70
+
+# Not team clips
+SKIP = {"full_video.mp4", "test_video.mp4"}
+
+
+def read_frames(clip, width=WIDTH, fps=SAMPLE_FPS):
+    """Decode a clip to an (n, h, w, 3) uint8 array through a rawvideo pipe."""
+    out, err = (
+        ffmpeg
+        .input(str(clip))
+        .filter("fps", fps)
+        .filter("scale", width, -2)
+        .output("pipe:", format="rawvideo", pix_fmt="rgb24")
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    # The output stream line carries the scaled size
+    w, h = map(int, re.findall(r"rawvideo.*?, (\d+)x(\d+)", err.decode("utf-8", "replace"))[-1])
+    return np.frombuffer(out, np.uint8).reshape(-1, h, w, 3)
+
+
+def poster_index(frames):
+    """Index of the most representative frame.
+
+    Sharp, well exposed frames close to the clip's typical colours win; the
+    first and last 10% are skipped since clips often start or end on a fade.
+    """
+    luma = frames.astype(np.float32) @ np.array([0.299, 0.587, 0.114], np.float32) / 255
+    brightness = luma.mean(axis=(1, 2))
+    contrast = luma.std(axis=(1, 2))
+    sharpness = np.abs(np.diff(luma, axis=2)).mean(axis=(1, 2)) + np.abs(np.diff(luma, axis=1)).mean(axis=(1, 2))
+
+    colours = frames.reshape(len(frames), -1, 3).mean(axis=1)
+    distance = np.linalg.norm(colours - np.median(colours, axis=0), axis=1) / 255
+
+    score = sharpness * contrast * (1 - distance)
+    score[(brightness < 0.1) | (brightness > 0.9)] = 0
+    edge = len(frames) // 10
+    if len(frames) > 2 * edge + 1:
+        score[:edge] = score[len(frames) - edge:] = -1
+    return int(np.argmax(score))
+
+
+def _save(img, out_file):
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = out_file.with_name(f"{out_file.name}.{os.getpid()}.tmp")
+    img.save(tmp_file, format="WEBP", quality=QUALITY, method=6)
+    tmp_file.replace(out_file)
+
+
+def extract(clip, out_dir=OUT_DIR):
+    """Write <team>.webp (poster) and <team>_strip.webp (thumbnail strip) for one clip."""
+    clip = Path(clip)
+    poster = out_dir / f"{clip.stem}.webp"
+    strip = out_dir / f"{clip.stem}_strip.webp"
+    mtime = clip.stat().st_mtime_ns
+    if all(f.exists() and f.stat().st_mtime_ns >= mtime for f in (poster, strip)):
+        return clip.stem, False
+
+    frames = read_frames(clip)
+    _save(Image.fromarray(frames[poster_index(frames)]), poster)
+
+    # Evenly spaced frames side by side, each STRIP_WIDTH wide
+    picks = np.linspace(0, len(frames) - 1, min(STRIP_FRAMES, len(frames))).round().astype(int)
+    h = round(frames.shape[1] * STRIP_WIDTH / frames.shape[2])
+    tiles = [Image.fromarray(frames[i]).resize((STRIP_WIDTH, h), Image.LANCZOS) for i in picks]
+    sheet = Image.new("RGB", (STRIP_WIDTH * len(tiles), h))
+    for i, tile in enumerate(tiles):
+        sheet.paste(tile, (i * STRIP_WIDTH, 0))
+    _save(sheet, strip)
+    return clip.stem, True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poster frames and thumbnail strips for the team clips.")
+    parser.add_argument("clips", nargs="*", help="clips to process (default: every team clip here)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    clips = args.clips or sorted(p for p in Path(".").glob("*.mp4") if p.name not in SKIP)
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for team, written in pool.map(extract, clips):
+            print(f"{'Created' if written else 'Up to date'}: {team}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import ffmpeg
+import numpy as np
+
+# Analysis runs on tiny frames; cuts only need coarse structure
+WIDTH, HEIGHT = 64, 36
+FPS = 10
+WINDOW = 60  # seconds of video per worker task
+BINS = 8  # per RGB channel
+
+CUT_THRESHOLD = 0.35  # histogram distance, 0..1
+DARK = 0.08  # mean brightness of fade/black frames
+MIN_SEGMENT = 15  # seconds
+
+
+def duration(source):
+    _out, err = ffmpeg.input(source).output("-", format="null", t=0).run(capture_stderr=True)
+    h, m, s = re.search(r"Duration: (\d+):(\d+):([\d.]+)", err.decode("utf-8", "replace")).groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def analyze_window(source, start, length, fps=FPS):
+    """Per-frame (time, brightness, RGB histogram, small grey frame) for one window."""
+    out, _err = (
+        ffmpeg
+        .input(source, ss=start, t=length)
+        .filter("fps", fps)
+        .filter("scale", WIDTH, HEIGHT)
+        .output("pipe:", format="rawvideo", pix_fmt="rgb24", **{"frames:v": round(length * fps)})
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    frames = np.frombuffer(out, np.uint8).reshape(-1, HEIGHT * WIDTH, 3)
+    grey = frames.astype(np.float32) @ np.array([0.299, 0.587, 0.114], np.float32) / 255
+
+    # One bincount for every frame's joint RGB histogram
+    q = (frames // (256 // BINS)).astype(np.int64)
+    bins = (q[..., 0] * BINS + q[..., 1]) * BINS + q[..., 2]
+    offsets = np.arange(len(frames))[:, None] * BINS ** 3
+    hist = np.bincount((bins + offsets).ravel(), minlength=len(frames) * BINS ** 3)
+    hist = hist.reshape(len(frames), BINS ** 3) / (HEIGHT * WIDTH)
+    times = start + np.arange(len(frames)) / fps
+    return times, grey.mean(axis=1), hist.astype(np.float32), grey
+
+
+def analyze(source, jobs=None, fps=FPS):
+    """Frame metrics for the whole video, windows decoded in parallel."""
+    total = duration(source)
+    starts = np.arange(0, total, WINDOW)
+    lengths = np.minimum(WINDOW, total - starts)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        parts = list(pool.map(analyze_window, [source] * len(starts), starts, lengths, [fps] * len(starts)))
+    times, brightness, hist, grey = (np.concatenate(p) for p in zip(*parts))
+
+    # Differences between consecutive frames (first frame: 0)
+    hist_dist = np.r_[0, np.abs(np.diff(hist, axis=0)).sum(axis=1) / 2]
+    pixel_diff = np.r_[0, np.abs(np.diff(grey, axis=0)).mean(axis=1)]
+    return times, brightness, hist_dist, pixel_diff
+
+
+def segments(times, brightness, hist_dist, pixel_diff, threshold=CUT_THRESHOLD, min_segment=MIN_SEGMENT):
+    """(start, end) pairs: shots split at cuts, dark gaps dropped, short shots merged."""
+    # A cut stands out from its neighbourhood as well as exceeding the threshold
+    local = np.convolve(hist_dist, np.ones(2 * FPS + 1) / (2 * FPS + 1), mode="same")
+    cut = ((hist_dist > threshold) & (hist_dist > 3 * local)) | (pixel_diff > 0.5)
+    dark = brightness < DARK
+
+    # Shots are runs of non-dark frames between cuts
+    shot_id = np.cumsum(cut | np.r_[False, dark[1:] != dark[:-1]])
+    shots = []
+    for sid in np.unique(shot_id[~dark]):
+        idx = np.flatnonzero((shot_id == sid) & ~dark)
+        shots.append([times[idx[0]], times[idx[-1]] + 1 / FPS])
+
+    # Dark gaps between team segments are the natural boundaries; plain cuts
+    # inside a segment are merged away. Without any gaps, split at cuts.
+    frame = 1 / FPS
+    gaps = any(b[0] - a[1] > frame for a, b in zip(shots, shots[1:]))
+    merged = []
+    for start, end in shots:
+        contiguous = merged and start - merged[-1][1] <= frame
+        if merged and ((gaps and contiguous) or merged[-1][1] - merged[-1][0] < min_segment):
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(round(s, 2), round(e, 2)) for s, e in merged if e - s >= min_segment]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Propose clip boundaries for splitter.py from scene cuts.")
+    parser.add_argument("--source", default="full_video.mp4")
+    parser.add_argument("-o", "--output", default="timestamps.json")
+    parser.add_argument("--names", default=None, help="comma-separated clip names, in order")
+    parser.add_argument("--threshold", type=float, default=CUT_THRESHOLD)
+    parser.add_argument("--min-segment", type=float, default=MIN_SEGMENT)
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    found = segments(*analyze(args.source, jobs=args.jobs), threshold=args.threshold, min_segment=args.min_segment)
+    names = args.names.split(",") if args.names else []
+    if names and len(names) != len(found):
+        print(f"Warning: {len(names)} names for {len(found)} segments, extra segments are numbered")
+    timestamps = {
+        names[i] if i < len(names) else f"segment_{i + 1:02d}": [start, end]
+        for i, (start, end) in enumerate(found)
+    }
+
+    tmp_file = f"{args.output}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(timestamps, f, indent=2)
+    os.replace(tmp_file, args.output)
+    print(f"{len(timestamps)} segments written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,14 @@
+import argparse
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from functools import partial
+from pathlib import Path
+
 import ffmpeg
 
 timestamps = {
@@ -26,13 +37,353 @@ timestamps = {
 
 input_video = "full_video.mp4"
 
-for team, (start, end) in timestamps.items():
-    output = f"{team}.mp4"
+
+def load_timestamps(path):
+    """{name: (start, end)} from a JSON file such as the one scenes.py writes."""
+    with open(path, encoding="utf-8") as f:
+        return {name: tuple(span) for name, span in json.load(f).items()}
+
+
+ENCODE = dict(vcodec="libx264", acodec="aac", strict="experimental")
+
+# Hover playback (graph6): 320px wide like #hoverVideo, moov atom up front so
+# the first frame needs only the first few KB, short GOPs for quick starts
+HOVER_ENCODE = dict(vcodec="libx264", pix_fmt="yuv420p", preset="slow", crf=27, g=30,
+                    movflags="+faststart", acodec="aac", audio_bitrate="96k")
+HOVER_LOW_ENCODE = dict(HOVER_ENCODE, crf=None, video_bitrate="250k", maxrate="300k", bufsize="600k")
+
+AUDIO_OPTIONS = ("acodec", "audio_bitrate")
+
+PROFILES = {
+    # name: (output dir, scale width, {file suffix: output options})
+    "archive": (".", None, {"": ENCODE}),
+    "hover": ("web", 320, {"": HOVER_ENCODE}),
+}
+
+
+def make_profile(name="archive", low_bitrate=False, audio=True):
+    out_dir, width, renditions = PROFILES[name]
+    renditions = dict(renditions)
+    if low_bitrate:
+        renditions[".low"] = HOVER_LOW_ENCODE
+    renditions = {
+        suffix: {k: v for k, v in opts.items() if v is not None and (audio or k not in AUDIO_OPTIONS)}
+        for suffix, opts in renditions.items()
+    }
+    return {"dir": out_dir, "width": width, "audio": audio, "renditions": renditions}
+
+
+def cap_clips(clips, max_duration):
+    if not max_duration:
+        return clips
+    return {team: (start, min(end, start + max_duration)) for team, (start, end) in clips.items()}
+
+
+def _clip_outputs(team, video, audio, profile, **extra):
+    """Output nodes for one clip, one per rendition of the profile."""
+    if profile["width"]:
+        video = video.filter("scale", profile["width"], -2)
+    renditions = profile["renditions"]
+    videos = video.filter_multi_output("split", len(renditions)) if len(renditions) > 1 else None
+    audios = audio.filter_multi_output("asplit", len(renditions)) if len(renditions) > 1 else None
+    Path(profile["dir"]).mkdir(parents=True, exist_ok=True)
+
+    outputs = []
+    for i, (suffix, opts) in enumerate(renditions.items()):
+        streams = [videos.stream(i) if videos else video]
+        if profile["audio"]:
+            streams.append(audios.stream(i) if audios else audio)
+        outputs.append(ffmpeg.output(*streams, str(Path(profile["dir"]) / f"{team}{suffix}.mp4"), **opts, **extra))
+    return outputs
+
+
+def split_sequential(clips, source=input_video, profile=None):
+    # One ffmpeg run per clip: reopens and seeks the source every time
+    profile = profile or make_profile()
+    for team, (start, end) in clips.items():
+        stream = ffmpeg.input(source, ss=start, to=end)
+        ffmpeg.merge_outputs(*_clip_outputs(team, stream.video, stream.audio, profile)).overwrite_output().run()
+        print(f"Created {team}.mp4")
+
+
+def split_single_pass(clips, source=input_video, cores=None, profile=None):
+    """Decode the source once and cut every clip from the same filter graph."""
+    profile = profile or make_profile()
+    # Split the core budget across the encoders (0 lets x264 pick)
+    encoders = len(clips) * len(profile["renditions"])
+    threads = max(1, cores // encoders) if cores else 0
+    stream = ffmpeg.input(source)
+    videos = stream.video.filter_multi_output("split", len(clips))
+    audios = stream.audio.filter_multi_output("asplit", len(clips))
+
+    outputs = []
+    for i, (team, (start, end)) in enumerate(clips.items()):
+        video = videos.stream(i).trim(start=start, end=end).setpts("PTS-STARTPTS")
+        audio = audios.stream(i).filter("atrim", start=start, end=end).filter("asetpts", "PTS-STARTPTS")
+        outputs += _clip_outputs(team, video, audio, profile, threads=threads)
+
+    ffmpeg.merge_outputs(*outputs).overwrite_output().run()
+    for team in clips:
+        print(f"Created {team}.mp4")
+
+
+def split_pool(clips, source=input_video, cores=None, threads_per_job=2, profile=None):
+    """Run several single-clip encodes at once within a total core budget."""
+    profile = profile or make_profile()
+    cores = cores or os.cpu_count() or 1
+    jobs = max(1, cores // threads_per_job)
+
+    def encode(item):
+        team, (start, end) = item
+        stream = ffmpeg.input(source, ss=start, to=end)
+        outputs = _clip_outputs(team, stream.video, stream.audio, profile, threads=threads_per_job)
+        ffmpeg.merge_outputs(*outputs).overwrite_output().run(quiet=True)
+        return f"{team}.mp4"
+
+    # ffmpeg does the work in its own process; threads only wait on it
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for output in pool.map(encode, clips.items()):
+            print(f"Created {output}")
+
+
+def packets(source=input_video):
+    """Codec name, presentation times (seconds) of every video packet and of
+    the keyframes among them, both sorted; packets are not decoded.
+
+    The times come straight from the container timestamps, so a keyframe
+    found here is also an exact entry of the packet times.
+    """
+    out, _err = (
+        ffmpeg
+        .input(source)
+        .video
+        .output("-", format="framecrc", vcodec="copy")
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    text = out.decode("utf-8", "replace")
+    codec = re.search(r"#codec_id 0: (\w+)", text)
+    num, den = map(int, re.search(r"#tb 0: (\d+)/(\d+)", text).groups())
+    times, keys = [], []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # stream, dts, pts, duration, size, crc[, F=flags]; the flags are
+        # only printed when they differ from a plain keyframe
+        fields = [f.strip() for f in line.split(",")]
+        t = int(fields[2]) * num / den
+        times.append(t)
+        if len(fields) < 7 or int(fields[6][2:], 16) & 1:
+            keys.append(t)
+    return (codec.group(1) if codec else None), sorted(times), sorted(keys)
+
+
+H264_PROFILES = {66: "baseline", 77: "main", 100: "high", 110: "high10", 122: "high422", 244: "high444"}
+
+
+def stream_params(source=input_video):
+    """x264 options matching the source's SPS (profile, level, pix_fmt, frame
+    rate) and its MP4 video timescale, read from one decoded frame.
+
+    Re-encoded edges are joined with stream-copied GOPs and the MP4 keeps a
+    single avcC, so the edges must not change the stream parameters mid-clip.
+    """
+    _out, err = (
+        ffmpeg
+        .input(source, debug="pict")
+        .output("-", format="null", **{"frames:v": 1})
+        .run(capture_stderr=True)
+    )
+    log = err.decode("utf-8", "replace")
+    options = {}
+    sps = re.search(r"sps:\d+ profile:(\d+)/(\d+)", log)
+    if sps:
+        profile, level = map(int, sps.groups())
+        if profile in H264_PROFILES:
+            options["profile:v"] = H264_PROFILES[profile]
+        options["level"] = f"{level // 10}.{level % 10}"
+    # VUI timing: num_units_in_tick/time_scale, two ticks per frame
+    timing = re.search(r"VUI \w+ (\d+)/(\d+)", log)
+    if timing and int(timing.group(1)):
+        rate = Fraction(int(timing.group(2)), 2 * int(timing.group(1)))
+        options["r"] = f"{rate.numerator}/{rate.denominator}"
+    pix_fmt = re.search(r"Video: h264.*?, (yuv\w+|gray\w*|nv\d+)", log)
+    if pix_fmt:
+        options["pix_fmt"] = pix_fmt.group(1)
+    tbn = re.search(r"([\d.]+)(k?) tbn", log)
+    timescale = round(float(tbn.group(1)) * (1000 if tbn.group(2) else 1)) if tbn else None
+    return options, timescale
+
+
+def _encode_part(source, start, output, frames, mux, options):
+    (
+        ffmpeg
+        .input(source, ss=start)
+        .output(output, an=None, vcodec="libx264", **mux, **options, **{"frames:v": frames})
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def _copy_part(source, start, output, frames, mux):
+    # -t alone lets through packets decoded before the end keyframe but
+    # shown after it, so bound the copy by frame count
     (
         ffmpeg
-        .input(input_video, ss=start, to=end)
-        .output(output, vcodec="libx264", acodec="aac", strict="experimental")  
+        .input(source, ss=start)
+        .output(output, an=None, vcodec="copy", avoid_negative_ts="make_zero", **mux, **{"frames:v": frames})
         .overwrite_output()
-        .run()
+        .run(quiet=True)
     )
-    print(f"Created {output}")
+
+
+def smart_cut(source, start, end, output, times, keys, params):
+    """Stream-copy the whole GOPs inside [start, end] and re-encode only the edges.
+
+    Returns False (nothing written) when the window holds no complete GOP;
+    the caller then re-encodes the clip. times and keys are the source's
+    packet and keyframe times (packets), params its stream parameters
+    (stream_params).
+    """
+    # Same frames as split_sequential: -ss/-to measures the clip length from
+    # the first frame kept, not from start
+    kept = bisect_left(times, start)
+    stop = times[kept] + (end - start) if kept < len(times) else end
+    inside = [k for k in keys if start <= k <= stop]
+    if len(inside) < 2:
+        return False
+    first, last = inside[0], inside[-1]
+    options, timescale = params
+    # MP4 parts in the source's timescale keep every timestamp exact (Matroska
+    # would round them to milliseconds)
+    mux = dict(format="mp4", **({"video_track_timescale": timescale} if timescale else {}))
+
+    with tempfile.TemporaryDirectory(dir=".") as tmp:
+        tmp = Path(tmp)
+        parts = [
+            (partial(_encode_part, options=options), start, first),
+            (_copy_part, first, last),
+            (partial(_encode_part, options=options), last, stop),
+        ]
+
+        # The concat demuxer puts each part's own SPS/PPS in-band at its
+        # keyframes (auto_convert), so copied and re-encoded H.264 can be joined
+        listing = []
+        for i, (cut, a, b) in enumerate(parts):
+            # Every part is bounded by its exact packet count, also for
+            # variable frame rate; -t rounds onto the next frame at the seams
+            frames = bisect_left(times, b) - bisect_left(times, a)
+            if not frames:
+                continue
+            part = tmp / f"part{i}.mp4"
+            cut(source, a, str(part), frames=frames, mux=mux)
+            listing.append(f"file '{part.resolve().as_posix()}'")
+        concat_list = tmp / "parts.txt"
+        concat_list.write_text("\n".join(listing) + "\n", encoding="utf-8")
+
+        # Audio is cheap to encode; doing it in one piece avoids gaps at the seams
+        video = ffmpeg.input(str(concat_list), format="concat", safe=0).video
+        audio = ffmpeg.input(source, ss=start, t=end - start).audio
+        (
+            ffmpeg
+            .output(video, audio, output, vcodec="copy", acodec="aac", **mux)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    return True
+
+
+def video_summary(path):
+    """(frame count, duration in seconds) of the first video stream, from its packets."""
+    _codec, times, _keys = packets(path)
+    if len(times) < 2:
+        return len(times), 0.0
+    # The last frame lasts as long as the one before it
+    return len(times), times[-1] - times[0] + (times[-1] - times[-2])
+
+
+def verify_cut(source, start, end, output):
+    """Compare a smart cut with the sequential re-encode of the same window.
+
+    Returns a list of mismatches, empty when both have the same number of
+    frames and their durations agree within one frame. The reference keeps
+    the source timestamps (vsync passthrough): by default ffmpeg pads a
+    window that starts between two frames with a copy of the first one.
+    """
+    with tempfile.TemporaryDirectory(dir=".") as tmp:
+        reference = str(Path(tmp) / "reference.mp4")
+        (
+            ffmpeg
+            .input(source, ss=start, to=end)
+            .output(reference, vsync="passthrough", **ENCODE)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+        expected_frames, expected_duration = video_summary(reference)
+    frames, duration = video_summary(output)
+    problems = []
+    if frames != expected_frames:
+        problems.append(f"{frames} frames, sequential has {expected_frames}")
+    if abs(duration - expected_duration) > expected_duration / max(expected_frames, 1):
+        problems.append(f"{duration:.3f} s, sequential has {expected_duration:.3f} s")
+    return problems
+
+
+def split_smart(clips, source=input_video, verify=False):
+    codec, times, keys = packets(source)
+    # Copied and re-encoded parts must share a codec to be concatenated
+    if codec == "h264":
+        params = stream_params(source)
+    for team, (start, end) in clips.items():
+        output = f"{team}.mp4"
+        if codec == "h264" and smart_cut(source, start, end, output, times, keys, params):
+            print(f"Created {output} (smart cut)")
+            if verify:
+                problems = verify_cut(source, start, end, output)
+                if problems:
+                    raise RuntimeError(f"{output} differs from the sequential cut: {'; '.join(problems)}")
+                print(f"Verified {output} against the sequential cut")
+            continue
+        (
+            ffmpeg
+            .input(source, ss=start, to=end)
+            .output(output, **ENCODE)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+        print(f"Created {output} (re-encoded)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cut the per-team clips out of the full video.")
+    parser.add_argument("--mode", choices=["sequential", "single-pass", "pool", "smart-cut"], default="sequential")
+    parser.add_argument("--source", default=input_video)
+    parser.add_argument("--timestamps", default=None, help="JSON {name: [start, end]} instead of the built-in list")
+    parser.add_argument("--cores", type=int, default=None, help="total core budget")
+    parser.add_argument("--threads-per-job", type=int, default=2, help="encoder threads per clip (pool mode)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="archive",
+                        help="hover: 320px faststart clips under web/ for the hover overlay")
+    parser.add_argument("--low-bitrate", action="store_true", help="also write a <team>.low.mp4 rendition")
+    parser.add_argument("--max-duration", type=float, default=None, help="cap every clip at this many seconds")
+    parser.add_argument("--no-audio", action="store_true", help="drop the audio track")
+    parser.add_argument("--verify", action="store_true",
+                        help="smart-cut: check every clip's frame count and duration against a sequential cut")
+    args = parser.parse_args(argv)
+
+    if args.mode == "smart-cut" and (args.profile != "archive" or args.low_bitrate or args.no_audio):
+        parser.error("smart-cut copies the source stream; it only supports the archive profile")
+    profile = make_profile(args.profile, low_bitrate=args.low_bitrate, audio=not args.no_audio)
+    clips = load_timestamps(args.timestamps) if args.timestamps else timestamps
+    clips = cap_clips(clips, args.max_duration)
+
+    if args.mode == "single-pass":
+        split_single_pass(clips, args.source, cores=args.cores, profile=profile)
+    elif args.mode == "pool":
+        split_pool(clips, args.source, cores=args.cores, threads_per_job=args.threads_per_job, profile=profile)
+    elif args.mode == "smart-cut":
+        split_smart(clips, args.source, verify=args.verify)
+    else:
+        split_sequential(clips, args.source, profile=profile)
+
+
+if __name__ == "__main__":
+    main()
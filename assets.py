@@ -0,0 +1,59 @@
+import hashlib
+import os
+from pathlib import Path
+
+# NFL_ASSETS=external writes plotly.js, page CSS/JS and logos once into
+# content-hashed files under dist/assets/ so every chart page shares them.
+# The default (inline) keeps each page self-contained.
+ASSET_DIR = Path("dist") / "assets"
+
+
+def external_assets():
+    return os.environ.get("NFL_ASSETS", "inline") == "external"
+
+
+def _hashed_path(data, name, ext):
+    digest = hashlib.sha1(data).hexdigest()[:12]
+    return ASSET_DIR / f"{name}.{digest}.{ext}"
+
+
+def _atomic_write(out_file, data):
+    # Parallel builds may write the same asset; never expose a partial file
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = out_file.with_name(f"{out_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(data)
+    tmp_file.replace(out_file)
+
+
+def write_asset(content, name, ext):
+    """Write content to dist/assets/<name>.<hash>.<ext> (once) and return its URL."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    out_file = _hashed_path(data, name, ext)
+    if not out_file.exists():
+        _atomic_write(out_file, data)
+    return out_file.as_posix()
+
+
+def copy_asset(path):
+    path = Path(path)
+    out_file = _hashed_path(path.read_bytes(), path.stem, path.suffix.lstrip("."))
+    if not out_file.exists():
+        _atomic_write(out_file, path.read_bytes())
+    return out_file.as_posix()
+
+
+def style_tag(css, name):
+    if external_assets():
+        return f'<link rel="stylesheet" href="{write_asset(css, name, "css")}">'
+    return f"<style>{css}</style>"
+
+
+def script_tag(js, name):
+    if external_assets():
+        return f'<script src="{write_asset(js, name, "js")}"></script>'
+    return f"<script>{js}</script>"
+
+
+def data_script(var, json_text):
+    # Page-specific data stays inline so the shared scripts can be cached
+    return f"<script>window.{var} = {json_text};</script>"
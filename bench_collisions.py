@@ -0,0 +1,97 @@
+import argparse
+import time
+
+import numpy as np
+
+from figure_builder import arc_offsets, overlapping_pairs, resolve_collisions, win_scale
+from team_data import load_teams
+
+# Same sizing and vertical limit as graph4.py / graph_radius.py
+MIN_LOGO, MAX_LOGO, EXP_FACTOR = 0.1, 0.3, 2.5
+MAX_DY = 0.4
+
+
+def team_points():
+    df = load_teams()
+    x = df["TV_Homes"].to_numpy(dtype=float)
+    y = df["Chmp"].to_numpy(dtype=float)
+    scale = win_scale(df["W-L%.1"], MIN_LOGO, MAX_LOGO, EXP_FACTOR)
+    return x, y, scale * x.max(), scale * y.max()
+
+
+def synthetic_points(n, rng):
+    """Franchise-season-like data: skewed markets, integer championship
+    counts (0-13, most at few), so arc groups have many members.
+
+    Logos shrink with sqrt(n) from about a third of the 32-team chart's logo
+    size. Points pile up on the few integer rows, so overlaps per point still
+    grow with n; the table prints them.
+    """
+    x = rng.lognormal(0.5, 0.6, n)
+    y = np.minimum(np.floor(rng.gamma(1.5, 1.0, n)), 13)
+    scale = win_scale(rng.random(n), MIN_LOGO, MAX_LOGO, EXP_FACTOR) / np.sqrt(max(n, 32) / 32) / 3
+    return x, y, scale * x.max(), scale * y.max()
+
+
+def arc_layout(x, y, w, h):
+    return arc_offsets(y, x.max() * 0.03, y_radius=0.2)
+
+
+# threshold=np.inf: the charts skip the resolver above NFL_LARGE_N points,
+# here it always runs so its cost and effect at scale stay visible
+def resolve_layout(x, y, w, h):
+    return resolve_collisions(x, y, w, h, max_dy=MAX_DY, threshold=np.inf)
+
+
+def arc_resolve_layout(x, y, w, h):
+    ax, ay = arc_layout(x, y, w, h)
+    dx, dy = resolve_collisions(x + ax, y + ay, w, h, max_dy=MAX_DY - np.abs(ay), threshold=np.inf)
+    return ax + dx, ay + dy
+
+
+METHODS = {
+    "none": lambda x, y, w, h: (np.zeros_like(x), np.zeros_like(y)),
+    "arc": arc_layout,
+    "resolve": resolve_layout,
+    "arc+resolve": arc_resolve_layout,
+}
+
+
+def measure(method, points, repeat):
+    x, y, w, h = points
+    w = np.broadcast_to(w, x.shape)
+    h = np.broadcast_to(h, x.shape)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dx, dy = METHODS[method](x, y, w, h)
+        best = min(best, time.perf_counter() - start)
+    overlaps = len(overlapping_pairs(x + dx, y + dy, w, h)[0])
+    shift = np.max(np.maximum(np.abs(dx) / w, np.abs(dy) / h), initial=0)
+    return best, overlaps, shift, np.max(np.abs(dy), initial=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logo overlap: arc spread vs the collision resolver.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated synthetic point counts (100000 takes minutes)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per method (best time is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    datasets = [("teams", team_points())]
+    datasets += [(str(n), synthetic_points(int(n), rng)) for n in args.sizes.split(",") if n]
+
+    # max shift: largest move relative to the logo size; max |dy|: in championships
+    print(f"{'points':>8} {'method':>12} {'time (ms)':>10} {'overlaps':>9} {'per point':>10} "
+          f"{'max shift':>10} {'max |dy|':>9}")
+    for name, points in datasets:
+        for method in METHODS:
+            seconds, overlaps, shift, dy = measure(method, points, args.repeat)
+            print(f"{name:>8} {method:>12} {seconds * 1000:>10.1f} {overlaps:>9} "
+                  f"{overlaps / len(points[0]):>10.2f} {shift:>10.2f} {dy:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatch
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+MANIFEST = Path(".cache") / "build_manifest.json"
+
+# Inputs shared by every chart script
+CHART_INPUTS = [
+    "team_data_pop.csv",
+    "NFL_Logos/*.png",
+    "team_data.py",
+    "figure_builder.py",
+    "logo_cache.py",
+    "assets.py",
+    "page.py",
+    "media_manifest.py",
+    "media_manifest.json",
+]
+
+# Clips Videos/splitter.py cuts by default (keys of its timestamps dict).
+# Listed by name: a Videos/*.mp4 glob would also match full_video.mp4, so a
+# deleted clip would never count as missing.
+CLIP_OUTPUTS = [f"Videos/{team}.mp4" for team in (
+    "Cardinals", "Lions", "Titans", "Chargers", "Browns", "Bills", "Jets",
+    "Dolphins", "Raiders", "Bears", "Commanders", "Niners", "Cowboys", "Colts",
+    "Steelers", "Saints", "Packers", "Giants", "Ravens", "Seahawks", "Broncos",
+)]
+
+# Environment switches that change what the scripts write (and their defaults)
+ENV_INPUTS = {
+    "NFL_ASSETS": "inline",
+    "NFL_COMPRESS": "",
+    "NFL_LARGE_N": "500",
+    "NFL_LOD_TOP_K": "0",
+}
+
+# Glob inputs may match nothing; plain paths are required.
+# graph4/graph5 write the same pages as graph_radius/graph6, so they only
+# build when asked for by name.
+TARGETS = {
+    "clips": {
+        "script": "Videos/splitter.py",
+        "cwd": "Videos",
+        "inputs": ["Videos/full_video.mp4"],
+        "outputs": CLIP_OUTPUTS,
+        "args": ["--mode", "single-pass"],
+    },
+    "hover_clips": {
+        "script": "Videos/splitter.py",
+        "cwd": "Videos",
+        "inputs": ["Videos/full_video.mp4"],
+        "outputs": ["Videos/web/*.mp4"],
+        "args": ["--mode", "pool", "--profile", "hover", "--low-bitrate", "--max-duration", "15"],
+    },
+    "posters": {
+        "script": "Videos/posters.py",
+        "cwd": "Videos",
+        "inputs": ["Videos/*.mp4"],
+        "outputs": ["Videos/posters/*.webp"],
+    },
+    "cheers": {
+        "script": "Audio/sprites.py",
+        "cwd": "Audio",
+        "inputs": ["Audio/CheeringSFX.mp3"],
+        "outputs": ["Audio/cheers.json"],
+    },
+    "media": {
+        "script": "media_manifest.py",
+        "inputs": ["team_data_pop.csv", "team_data.py", "NFL_Logos/*.png",
+                   "Videos/*.mp4", "Videos/web/*.mp4", "Videos/posters/*.webp"],
+        "outputs": ["media_manifest.json"],
+    },
+    "graph4": {
+        "script": "graph4.py",
+        "inputs": CHART_INPUTS,
+        "outputs": ["NFL_Teams_Chart.html"],
+        "default": False,
+    },
+    "graph_radius": {
+        "script": "graph_radius.py",
+        "inputs": CHART_INPUTS,
+        "outputs": ["NFL_Teams_Chart.html"],
+    },
+    "graph5": {
+        "script": "graph5.py",
+        "inputs": CHART_INPUTS + ["Videos/test_video.mp4"],
+        "outputs": ["NFL_Hover_Interactive.html"],
+        "default": False,
+    },
+    "graph6": {
+        "script": "graph6.py",
+        "inputs": CHART_INPUTS,
+        "outputs": ["NFL_Hover_Interactive.html"],
+    },
+    "graph7": {
+        "script": "graph7.py",
+        "inputs": CHART_INPUTS + ["Audio/*.json"],
+        "outputs": ["NFL_Teams_Chart4.html"],
+    },
+    "graph8": {
+        "script": "graph8.py",
+        "inputs": CHART_INPUTS,
+        "outputs": ["NFL_Teams_Chart3.html"],
+    },
+    "precompress": {
+        "script": "precompress.py",
+        "inputs": ["NFL_*.html", "media_manifest.json", "dist/assets/*.js", "dist/assets/*.css"],
+        "outputs": ["NFL_*.html.gz"],
+    },
+}
+
+
+def _is_glob(pattern):
+    return any(ch in pattern for ch in "*?[")
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dependencies(name):
+    """Targets whose outputs match one of this target's inputs."""
+    inputs = TARGETS[name]["inputs"]
+    return [
+        other for other, target in TARGETS.items()
+        if other != name and any(fnmatch(i, o) or fnmatch(o, i) for i in inputs for o in target["outputs"])
+    ]
+
+
+def input_hashes(name):
+    """Map every input file (plus the script and asset mode) to its hash, or None if a required input is missing."""
+    target = TARGETS[name]
+    paths = {target["script"]}
+    for pattern in target["inputs"]:
+        if _is_glob(pattern):
+            paths.update(glob.glob(pattern))
+        elif Path(pattern).exists():
+            paths.add(pattern)
+        else:
+            return None
+    hashes = {path: _file_hash(path) for path in sorted(paths)}
+    for var, default in ENV_INPUTS.items():
+        hashes[f"env:{var}"] = os.environ.get(var, default)
+    return hashes
+
+
+def outputs_exist(name):
+    return all(glob.glob(pattern) if _is_glob(pattern) else Path(pattern).exists()
+               for pattern in TARGETS[name]["outputs"])
+
+
+def load_manifest():
+    try:
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = MANIFEST.with_name(MANIFEST.name + ".tmp")
+    tmp_file.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_file.replace(MANIFEST)
+
+
+def shared_outputs(name):
+    """Other targets that write one of this target's outputs."""
+    outputs = set(TARGETS[name]["outputs"])
+    return [other for other, target in TARGETS.items() if other != name and outputs & set(target["outputs"])]
+
+
+def _run_target(name):
+    target = TARGETS[name]
+    os.chdir(ROOT / target.get("cwd", "."))
+    sys.argv = [target["script"]] + target.get("args", [])
+    try:
+        runpy.run_path(str(ROOT / target["script"]), run_name="__main__")
+    finally:
+        os.chdir(ROOT)
+    return name
+
+
+def _order(names):
+    # Pull in dependencies that are default targets, then sort topologically
+    ordered, seen = [], set()
+
+    def visit(name, chain=()):
+        if name in chain:
+            raise ValueError(f"dependency cycle: {' -> '.join(chain + (name,))}")
+        if name in seen:
+            return
+        for dep in dependencies(name):
+            if TARGETS[dep].get("default", True) or dep in names:
+                visit(dep, chain + (name,))
+        seen.add(name)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def build(names, jobs=None, force=False):
+    manifest = load_manifest()
+    pending = _order(names)
+    finished, failed = set(), set()
+
+    if any(name != "clips" for name in pending):
+        # Warm the team-data cache once before the workers start
+        from team_data import load_teams
+        load_teams()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending:
+            ready = [n for n in pending if not any(d in pending for d in dependencies(n))]
+            futures = {}
+            for name in ready:
+                pending.remove(name)
+                if any(dep in failed for dep in dependencies(name)):
+                    print(f"[skip] {name}: dependency failed")
+                    failed.add(name)
+                    continue
+                hashes = input_hashes(name)
+                if hashes is None:
+                    print(f"[skip] {name}: missing input")
+                    finished.add(name)
+                    continue
+                recorded = manifest.get(name, {}).get("inputs")
+                if not force and recorded == hashes and outputs_exist(name):
+                    print(f"[up to date] {name}")
+                    finished.add(name)
+                    continue
+                futures[pool.submit(_run_target, name)] = (name, hashes)
+
+            for future in as_completed(futures):
+                name, hashes = futures[future]
+                try:
+                    future.result()
+                except BaseException as exc:
+                    print(f"[failed] {name}: {exc!r}")
+                    failed.add(name)
+                    continue
+                manifest[name] = {"inputs": hashes, "outputs": TARGETS[name]["outputs"]}
+                for other in shared_outputs(name):
+                    manifest.pop(other, None)  # its output was just overwritten
+                save_manifest(manifest)
+                print(f"[built] {name}")
+                finished.add(name)
+
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild charts and media whose inputs changed.")
+    parser.add_argument("targets", nargs="*", help="targets to build (default: all default targets)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="parallel worker processes")
+    parser.add_argument("--force", action="store_true", help="rebuild even if inputs are unchanged")
+    parser.add_argument("--list", action="store_true", help="list targets and exit")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    if args.list:
+        for name, target in TARGETS.items():
+            flag = "" if target.get("default", True) else "  (on request)"
+            print(f"{name}: {target['script']} -> {', '.join(target['outputs'])}{flag}")
+        return 0
+
+    names = args.targets or [n for n, t in TARGETS.items() if t.get("default", True)]
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+    clashes = sorted({n for n in names for other in shared_outputs(n) if other in names})
+    if clashes:
+        parser.error(f"targets write the same outputs: {', '.join(clashes)}")
+    return 0 if build(names, jobs=args.jobs, force=args.force) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
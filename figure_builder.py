@@ -0,0 +1,487 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+
+from assets import copy_asset, external_assets, script_tag
+from logo_cache import data_uri, logo_atlas, logo_data_uri, logo_variant
+from media_manifest import team_assets
+
+# Plotly's defaults when the layout leaves them unset
+DEFAULT_SIZE = {"x": 700, "y": 450}
+DEFAULT_MARGIN = {"l": 80, "r": 80, "t": 100, "b": 80}
+
+# Above this many points (NFL_LARGE_N) charts switch to WebGL markers and
+# draw logos from one sprite atlas on a canvas instead of one <image> each.
+# Only charts that opt in (numeric axes, page emits logo_sprites_script) do.
+LARGE_N = int(os.environ.get("NFL_LARGE_N", "500"))
+SPRITE_MAX_PX = 256
+
+# Level of detail for the sprite layer: only the top-K visible logos (by
+# drawn size) are drawn at the current zoom, the rest as small markers.
+# NFL_LOD_TOP_K also turns the sprite layer on for small charts.
+LOD_TOP_K = int(os.environ.get("NFL_LOD_TOP_K", "0"))
+LARGE_TOP_K = 300
+GRID_POINTS = 8  # average points per spatial index cell
+
+
+def logo_file(team):
+    # Looked up in media_manifest.json; None when the team has no logo
+    logo = team_assets(team).get("logo")
+    return Path(logo) if logo else None
+
+
+def large_mode(n, threshold=None):
+    return n > (LARGE_N if threshold is None else threshold)
+
+
+def scatter_trace(x, y, threshold=None, **kwargs):
+    """go.Scatter, or go.Scattergl once the point count is above the large-N threshold."""
+    trace = go.Scattergl if large_mode(len(x), threshold) else go.Scatter
+    return trace(x=x, y=y, **kwargs)
+
+
+def win_scale(win_pct, min_logo, max_logo, exp_factor):
+    # Exaggerate differences by raising the normalized win % to a power (>1)
+    win_pct = np.asarray(win_pct, dtype=float)
+    normalized = (win_pct - win_pct.min()) / (win_pct.max() - win_pct.min())
+    return min_logo + normalized ** exp_factor * (max_logo - min_logo)
+
+
+def arc_offsets(groups, radius, y_radius=0.2, half_angle=np.pi / 4):
+    """Spread the members of each group evenly across a small arc.
+
+    Same layout as looping np.linspace(-half_angle, half_angle, len(group))
+    over df.groupby(...), computed for all rows at once.
+    """
+    groups = np.asarray(groups)
+    order = np.argsort(groups, kind="stable")
+    _, inverse, counts = np.unique(groups[order], return_inverse=True, return_counts=True)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    sorted_rank = np.arange(len(groups)) - starts[inverse]
+    sorted_size = counts[inverse]
+    rank = np.empty_like(sorted_rank)
+    rank[order] = sorted_rank
+    size = np.empty_like(sorted_size)
+    size[order] = sorted_size
+
+    # linspace with a single sample returns its start point
+    t = np.divide(rank, size - 1, out=np.zeros(len(groups)), where=size > 1)
+    angles = -half_angle + t * 2 * half_angle
+    return np.cos(angles) * radius, np.sin(angles) * y_radius
+
+
+def overlapping_pairs(x, y, w, h):
+    """Index arrays (i, j), i < j, of the boxes (centre x, y; size w, h) that overlap.
+
+    Boxes are bucketed on a grid with cells as big as the largest box, so
+    only a cell and its neighbours are compared: one sort (O(n log n)) plus
+    the candidate pairs, instead of all n^2 pairs.
+    """
+    x, y, w, h = (np.asarray(v, dtype=float) for v in (x, y, w, h))
+    n = len(x)
+    if n < 2:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    col = np.floor(x / max(w.max(), 1e-12)).astype(np.int64)
+    row = np.floor(y / max(h.max(), 1e-12)).astype(np.int64)
+    col -= col.min()
+    row -= row.min()
+    # Two spare columns so the left neighbour of column 0 never wraps onto a used cell
+    width = col.max() + 3
+    key = row * width + col
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    pairs_i, pairs_j = [], []
+    # Own cell plus the four "forward" neighbours covers every adjacent pair
+    # once. Work on sorted positions: the targets are sorted too, which keeps
+    # searchsorted cheap.
+    for dc, dr in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+        target = sorted_key + (dr * width + dc)
+        lo = np.searchsorted(sorted_key, target, "left")
+        counts = np.searchsorted(sorted_key, target, "right") - lo
+        i = np.repeat(np.arange(n), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = np.repeat(lo, counts) + within
+        if dc == dr == 0:
+            i, j = i[i < j], j[i < j]
+        pairs_i.append(i)
+        pairs_j.append(j)
+    i = order[np.concatenate(pairs_i)]
+    j = order[np.concatenate(pairs_j)]
+
+    hit = (np.abs(x[i] - x[j]) * 2 < w[i] + w[j]) & (np.abs(y[i] - y[j]) * 2 < h[i] + h[j])
+    i, j = i[hit], j[hit]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def resolve_collisions(x, y, w, h, max_shift=0.5, max_dx=np.inf, max_dy=np.inf, iterations=50, step=1.0,
+                       threshold=None):
+    """Offsets (dx, dy) that push overlapping boxes apart.
+
+    Each round finds the overlapping pairs with overlapping_pairs and moves
+    both boxes of a pair apart along the axis that needs the smaller push
+    (relative to their size). A box never moves more than max_shift times
+    its own size from where it started, so dense clusters keep some overlap
+    rather than drifting away from their data. max_dx / max_dy (data units,
+    scalar or per box) cap the move further, e.g. below 0.5 on an integer
+    axis so a logo still reads as its own value; pairs whose boxes have no
+    room left on that axis are pushed along the other one. Stops early once
+    nothing overlaps. Returns the round with the fewest overlapping pairs,
+    so the result is never worse than the input layout (zero offsets if no
+    round beats it). Above the large-N threshold it returns zero offsets:
+    there it costs seconds and barely beats the arc spread, and the sprite
+    layer's level of detail hides overlaps anyway (see bench_collisions.py).
+    Same return shape as arc_offsets.
+    """
+    x0 = np.asarray(x, dtype=float)
+    y0 = np.asarray(y, dtype=float)
+    n = len(x0)
+    if large_mode(n, threshold):
+        return np.zeros(n), np.zeros(n)
+    w = np.broadcast_to(np.asarray(w, dtype=float), (n,))
+    h = np.broadcast_to(np.asarray(h, dtype=float), (n,))
+    limit_x = np.minimum(max_shift * w, max_dx)
+    limit_y = np.minimum(max_shift * h, max_dy)
+    px, py = x0.copy(), y0.copy()
+    best_x, best_y, best_count = px, py, None
+
+    for round_ in range(iterations + 1):
+        i, j = overlapping_pairs(px, py, w, h)
+        if best_count is None or len(i) < best_count:
+            best_x, best_y, best_count = px, py, len(i)
+        if not len(i) or round_ == iterations:
+            break
+        dx = px[j] - px[i]
+        dy = py[j] - py[i]
+        over_x = (w[i] + w[j]) / 2 - np.abs(dx)
+        over_y = (h[i] + h[j]) / 2 - np.abs(dy)
+        along_x = over_x / (w[i] + w[j]) < over_y / (h[i] + h[j])
+        # Prefer the axis where both boxes can still move their half of the push
+        room_x = limit_x - np.abs(px - x0)
+        room_x = np.minimum(room_x[i], room_x[j])
+        room_y = limit_y - np.abs(py - y0)
+        room_y = np.minimum(room_y[i], room_y[j])
+        along_x = np.where(along_x, over_x / 2 <= room_x, over_y / 2 > room_y)
+
+        # Push a hair past touching so resolved pairs stop counting as overlaps.
+        # Coincident boxes: j goes right/up, i left/down
+        over_x += 1e-9 * (w[i] + w[j])
+        over_y += 1e-9 * (h[i] + h[j])
+        push_x = np.where(along_x, over_x * np.where(dx < 0, -1.0, 1.0), 0) * step / 2
+        push_y = np.where(along_x, 0, over_y * np.where(dy < 0, -1.0, 1.0)) * step / 2
+        new_x = px + np.bincount(j, push_x, n) - np.bincount(i, push_x, n)
+        new_y = py + np.bincount(j, push_y, n) - np.bincount(i, push_y, n)
+        new_x = x0 + np.clip(new_x - x0, -limit_x, limit_x)
+        new_y = y0 + np.clip(new_y - y0, -limit_y, limit_y)
+        # Everything still overlapping is pinned at its displacement limit
+        if np.array_equal(new_x, px) and np.array_equal(new_y, py):
+            break
+        px, py = new_x, new_y
+
+    return best_x - x0, best_y - y0
+
+
+def pixels_per_unit(fig, axis):
+    """Approximate screen pixels per data unit along "x" or "y".
+
+    Uses the explicit axis range when set, otherwise the extent of the trace
+    data (number of categories for categorical axes).
+    """
+    layout = fig.layout
+    margin = {side: getattr(layout.margin, side) for side in DEFAULT_MARGIN}
+    margin = {side: DEFAULT_MARGIN[side] if value is None else value for side, value in margin.items()}
+    if axis == "x":
+        plot_px = (layout.width or DEFAULT_SIZE["x"]) - margin["l"] - margin["r"]
+    else:
+        plot_px = (layout.height or DEFAULT_SIZE["y"]) - margin["t"] - margin["b"]
+
+    axis_range = layout[f"{axis}axis"].range
+    if axis_range is not None:
+        span = axis_range[1] - axis_range[0]
+    else:
+        values = np.concatenate([np.asarray(trace[axis], dtype=object) for trace in fig.data if trace[axis] is not None])
+        try:
+            values = values.astype(float)
+            span = (values.max() - values.min()) * 1.1
+        except (TypeError, ValueError):
+            span = len(set(values))
+    return plot_px / max(span, 1e-9)
+
+
+def add_logos(fig, teams, x, y, sizex, sizey, threshold=None, top_k=None, sprites=False, **image_kwargs):
+    """Add one logo per team in a single layout update.
+
+    Calling fig.add_layout_image per row re-validates the whole images tuple
+    every time, which grows quadratically with the number of points. Logos
+    are embedded pre-trimmed and downscaled to their drawn size, so call this
+    after the axes and figure size are set. With sprites=True (numeric x/y
+    only, and the page must include logo_sprites_script), logos above the
+    large-N threshold or with a top_k level of detail go to a sprite layer
+    instead (see add_logo_sprites).
+    """
+    teams = list(teams)
+    n = len(teams)
+    x = np.broadcast_to(np.asarray(x, dtype=object), (n,))
+    y = np.broadcast_to(np.asarray(y, dtype=object), (n,))
+    sizex = np.broadcast_to(np.asarray(sizex, dtype=float), (n,))
+    sizey = np.broadcast_to(np.asarray(sizey, dtype=float), (n,))
+
+    if sprites:
+        top_k = LOD_TOP_K if top_k is None else top_k
+        if large_mode(n, threshold):
+            return add_logo_sprites(fig, teams, x, y, sizex, sizey, top_k=top_k or LARGE_TOP_K)
+        if top_k:
+            return add_logo_sprites(fig, teams, x, y, sizex, sizey, top_k=top_k)
+
+    box_w = sizex * pixels_per_unit(fig, "x")
+    box_h = sizey * pixels_per_unit(fig, "y")
+
+    image_kwargs = {
+        "xref": "x",
+        "yref": "y",
+        "xanchor": "center",
+        "yanchor": "middle",
+        **image_kwargs,
+    }
+
+    images = []
+    for i, team in enumerate(teams):
+        png_file = logo_file(team)
+        if png_file is None:
+            continue
+        images.append(dict(
+            x=_scalar(x[i]),
+            y=_scalar(y[i]),
+            source=_logo_source(png_file, (box_w[i], box_h[i])),
+            sizex=float(sizex[i]),
+            sizey=float(sizey[i]),
+            **image_kwargs,
+        ))
+
+    fig.update_layout(images=list(fig.layout.images) + images)
+    return fig
+
+
+def grid_index(x, y, cell_points=GRID_POINTS):
+    """Uniform grid over the points, as CSR arrays.
+
+    Returns (grid, offsets, ids): the ids of cell c are ids[offsets[c]:offsets[c + 1]],
+    in ascending order, with cells numbered row by row from (x0, y0).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nx = ny = int(np.clip(np.ceil(np.sqrt(len(x) / cell_points)), 1, 64))
+    x0, y0 = (float(v.min()) if len(v) else 0.0 for v in (x, y))
+    dx, dy = (max(float(np.ptp(v)) / nx, 1e-9) if len(v) else 1.0 for v in (x, y))
+    col = np.minimum(((x - x0) / dx).astype(int), nx - 1)
+    row = np.minimum(((y - y0) / dy).astype(int), ny - 1)
+    cell = row * nx + col
+
+    ids = np.argsort(cell, kind="stable")
+    offsets = np.searchsorted(cell[ids], np.arange(nx * ny + 1))
+    grid = {"x0": float(x0), "y0": float(y0), "dx": float(dx), "dy": float(dy), "nx": nx, "ny": ny}
+    return grid, offsets.tolist(), ids.tolist()
+
+
+def add_logo_sprites(fig, teams, x, y, sizex, sizey, top_k=LARGE_TOP_K):
+    """Store the logos as a sprite layer in layout.meta["logoSprites"].
+
+    Every distinct logo is packed once into an atlas; points only carry
+    their position, size and atlas index. Points are ordered by drawn size
+    (largest first) and indexed on a grid, so the browser finds the top_k
+    visible logos without scanning every point. LOGO_SPRITES_JS draws them
+    on a canvas over the plot (include logo_sprites_script(fig) in the page).
+    """
+    files = {}
+    index = []
+    keep = []
+    for i, team in enumerate(teams):
+        png_file = logo_file(team)
+        if png_file is None:
+            continue
+        index.append(files.setdefault(png_file, len(files)))
+        keep.append(i)
+    keep = np.asarray(keep, dtype=int)
+    index = np.asarray(index, dtype=int)
+
+    # Priority order: biggest logos first, ties keep the input order
+    area = (np.asarray(sizex, dtype=float) * np.asarray(sizey, dtype=float))[keep]
+    order = np.argsort(-area, kind="stable")
+    keep, index = keep[order], index[order]
+
+    # Cells at the largest drawn size (capped); smaller logos are scaled down on the canvas
+    box_px = (
+        min(SPRITE_MAX_PX, float(np.max(np.asarray(sizex, dtype=float)[keep], initial=1)) * pixels_per_unit(fig, "x")),
+        min(SPRITE_MAX_PX, float(np.max(np.asarray(sizey, dtype=float)[keep], initial=1)) * pixels_per_unit(fig, "y")),
+    )
+    atlas, rects = logo_atlas(list(files), box_px)
+    px = np.asarray(x, dtype=float)[keep]
+    py = np.asarray(y, dtype=float)[keep]
+    grid, offsets, ids = grid_index(px, py)
+    sprites = {
+        "atlas": copy_asset(atlas) if external_assets() else data_uri(atlas),
+        "rects": rects,
+        "x": px.round(4).tolist(),
+        "y": py.round(4).tolist(),
+        "w": np.asarray(sizex, dtype=float)[keep].round(4).tolist(),
+        "h": np.asarray(sizey, dtype=float)[keep].round(4).tolist(),
+        "i": index.tolist(),
+        "topK": int(top_k),
+        "grid": grid,
+        "offsets": offsets,
+        "ids": ids,
+    }
+    meta = fig.layout.meta if isinstance(fig.layout.meta, dict) else {}
+    fig.update_layout(meta={**meta, "logoSprites": sprites})
+    return fig
+
+
+# Draws layout.meta.logoSprites on a canvas between the WebGL markers and the
+# hover layer. After each debounced relayout the grid index picks the top-K
+# visible logos; other visible points are drawn as dots. Redrawn at most once
+# per frame, also while panning.
+LOGO_SPRITES_JS = """
+(function () {
+    document.querySelectorAll('.plotly-graph-div').forEach(function (gd) {
+        var layer = gd.layout && gd.layout.meta && gd.layout.meta.logoSprites;
+        if (!layer || !gd.on) return;
+
+        var canvas = document.createElement('canvas');
+        canvas.className = 'logo-sprites';
+        canvas.style.cssText = 'position:absolute; left:0; top:0; pointer-events:none;';
+        var atlas = new Image();
+        var grid = layer.grid;
+        var maxW = layer.w.reduce(function (a, b) { return Math.max(a, b); }, 0);
+        var maxH = layer.h.reduce(function (a, b) { return Math.max(a, b); }, 0);
+        var frame = 0, timer = 0;
+        var view = null;  // axis ranges while a drag is in progress
+        var logos = [], dots = [];  // current level of detail
+
+        function ranges() {
+            var fl = gd._fullLayout;
+            return { x: (view && view.x) || fl.xaxis.range, y: (view && view.y) || fl.yaxis.range };
+        }
+
+        function select() {
+            // Grid cells overlapping the viewport, widened by half the largest logo
+            timer = 0;
+            var r = ranges();
+            var c0 = Math.max(0, Math.floor((Math.min(r.x[0], r.x[1]) - maxW / 2 - grid.x0) / grid.dx));
+            var c1 = Math.min(grid.nx - 1, Math.floor((Math.max(r.x[0], r.x[1]) + maxW / 2 - grid.x0) / grid.dx));
+            var r0 = Math.max(0, Math.floor((Math.min(r.y[0], r.y[1]) - maxH / 2 - grid.y0) / grid.dy));
+            var r1 = Math.min(grid.ny - 1, Math.floor((Math.max(r.y[0], r.y[1]) + maxH / 2 - grid.y0) / grid.dy));
+            var visible = [];
+            for (var row = r0; row <= r1; row++) {
+                for (var col = c0; col <= c1; col++) {
+                    var cell = row * grid.nx + col;
+                    for (var k = layer.offsets[cell]; k < layer.offsets[cell + 1]; k++) {
+                        var i = layer.ids[k];
+                        if (Math.abs(layer.x[i] - (r.x[0] + r.x[1]) / 2) <= Math.abs(r.x[1] - r.x[0]) / 2 + layer.w[i] / 2 &&
+                            Math.abs(layer.y[i] - (r.y[0] + r.y[1]) / 2) <= Math.abs(r.y[1] - r.y[0]) / 2 + layer.h[i] / 2) {
+                            visible.push(i);
+                        }
+                    }
+                }
+            }
+            // Ids are in priority order, so the smallest K are the top K
+            visible.sort(function (a, b) { return a - b; });
+            logos = visible.slice(0, layer.topK).reverse();  // biggest drawn last, on top
+            dots = visible.slice(layer.topK);
+            schedule();
+        }
+
+        function draw() {
+            frame = 0;
+            var fl = gd._fullLayout;
+            if (!fl || !atlas.complete) return;
+            var svgs = gd.querySelector('.svg-container');
+            if (canvas.parentNode !== svgs) {
+                // Above the plot (and WebGL markers), below the hover/info
+                // layer svg and the modebar that follow them
+                var after = svgs.querySelector(':scope > .gl-container') ||
+                            svgs.querySelector(':scope > svg.main-svg');
+                svgs.insertBefore(canvas, after ? after.nextSibling : svgs.firstChild);
+            }
+            var dpr = window.devicePixelRatio || 1;
+            if (canvas.width !== Math.round(fl.width * dpr) || canvas.height !== Math.round(fl.height * dpr)) {
+                canvas.width = Math.round(fl.width * dpr);
+                canvas.height = Math.round(fl.height * dpr);
+                canvas.style.width = fl.width + 'px';
+                canvas.style.height = fl.height + 'px';
+            }
+            var ctx = canvas.getContext('2d');
+            ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+            ctx.clearRect(0, 0, fl.width, fl.height);
+
+            var xa = fl.xaxis, ya = fl.yaxis, r = ranges();
+            var kx = xa._length / (r.x[1] - r.x[0]), ky = ya._length / (r.y[1] - r.y[0]);
+            var x0 = xa._offset, y0 = ya._offset;
+            ctx.save();
+            ctx.beginPath();
+            ctx.rect(x0, y0, xa._length, ya._length);
+            ctx.clip();
+
+            // One path for every dot
+            ctx.beginPath();
+            dots.forEach(function (i) {
+                ctx.rect(x0 + (layer.x[i] - r.x[0]) * kx - 1.5, y0 + (r.y[1] - layer.y[i]) * ky - 1.5, 3, 3);
+            });
+            ctx.fillStyle = 'rgba(80, 80, 80, 0.6)';
+            ctx.fill();
+
+            logos.forEach(function (i) {
+                var bw = layer.w[i] * kx, bh = layer.h[i] * ky;
+                var px = x0 + (layer.x[i] - r.x[0]) * kx, py = y0 + (r.y[1] - layer.y[i]) * ky;
+                var s = layer.rects[layer.i[i]];
+                // Fit inside the box like a layout image (sizing: contain)
+                var k = Math.min(bw / s[2], bh / s[3]);
+                ctx.drawImage(atlas, s[0], s[1], s[2], s[3], px - s[2] * k / 2, py - s[3] * k / 2, s[2] * k, s[3] * k);
+            });
+            ctx.restore();
+        }
+
+        function schedule() {
+            if (!frame) frame = requestAnimationFrame(draw);
+        }
+
+        function scheduleSelect() {
+            clearTimeout(timer);
+            timer = setTimeout(select, 150);
+        }
+
+        gd.on('plotly_relayouting', function (e) {
+            // A zoom box only previews the new range; the plot itself has not moved
+            if (gd._fullLayout.dragmode === 'zoom') return;
+            var x = [e['xaxis.range[0]'], e['xaxis.range[1]']], y = [e['yaxis.range[0]'], e['yaxis.range[1]']];
+            view = { x: x[0] === undefined ? null : x, y: y[0] === undefined ? null : y };
+            schedule();
+            scheduleSelect();
+        });
+        gd.on('plotly_relayout', function () { view = null; scheduleSelect(); schedule(); });
+        gd.on('plotly_afterplot', schedule);
+        atlas.onload = select;
+        atlas.src = layer.atlas;
+    });
+})();
+"""
+
+
+def logo_sprites_script(fig):
+    """<script> for the sprite layer, or "" when the figure has none."""
+    meta = fig.layout.meta
+    if isinstance(meta, dict) and "logoSprites" in meta:
+        return script_tag(LOGO_SPRITES_JS, "logo-sprites")
+    return ""
+
+
+def _logo_source(png_file, box_px):
+    if external_assets():
+        return copy_asset(logo_variant(png_file, box_px))
+    return logo_data_uri(png_file, box_px)
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
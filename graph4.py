@@ -1,16 +1,14 @@
-import pandas as pd
 import plotly.graph_objects as go
-from PIL import Image
-from pathlib import Path
-import numpy as np
+from assets import style_tag
+from page import PageWriter
+from team_data import load_teams
+from figure_builder import add_logos, logo_sprites_script, resolve_collisions, scatter_trace, win_scale
 
 # Load data
-df = pd.read_csv("team_data_pop.csv")
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Population'] = df['Population'].astype(float)
+df = load_teams()
 
 fig = go.Figure()
-fig.add_trace(go.Scatter(
+fig.add_trace(scatter_trace(
     x=df['TV_Homes'],
     y=df['Chmp'],
     mode='markers',
@@ -19,7 +17,6 @@ fig.add_trace(go.Scatter(
     hoverinfo='text'
 ))
 
-logo_path = Path("NFL_Logos")  
 min_logo = 0.1
 max_logo = 0.3
 
@@ -28,22 +25,7 @@ max_logo = 0.3
 # Exaggerate differences by raising to a power (>1)
 exp_factor = 2.5  # tweak between 2–3 for more exaggeration
 
-for idx, row in df.iterrows():
-    png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"  
-    if png_file.exists():
-            normalized = (row["W-L%.1"] - df["W-L%.1"].min()) / (df["W-L%.1"].max() - df["W-L%.1"].min())
-            scale = min_logo + (normalized ** exp_factor) * (max_logo - min_logo)
-            fig.add_layout_image(
-                x=row['TV_Homes'],
-                y=row['Chmp'],
-                source=Image.open(png_file),
-                xref="x",
-                yref="y",
-                sizex=scale * df['TV_Homes'].max(),
-                sizey=scale * df['Chmp'].max(),
-                xanchor="center",
-                yanchor="middle",
-            )
+scale = win_scale(df["W-L%.1"], min_logo, max_logo, exp_factor)
 
 fig.update_layout(
    title={
@@ -73,14 +55,25 @@ fig.update_layout(
    margin=dict(l=80, r=50, t=120, b=80)
 )
 
-plotly_html = fig.to_html(config={'staticPlot': False}, include_plotlyjs=True)
+# Nudge overlapping logos apart (each moves at most half its size, and less
+# than half a championship vertically so it still reads as its own count)
+sizex = scale * df['TV_Homes'].max()
+sizey = scale * df['Chmp'].max()
+offset_x, offset_y = resolve_collisions(df['TV_Homes'], df['Chmp'], sizex, sizey, max_dy=0.4)
 
-container_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8" />
-    <style>
-        body {{
+# Logos are pre-sized from the final layout
+add_logos(
+    fig,
+    df['Tm'],
+    x=df['TV_Homes'] + offset_x,
+    y=df['Chmp'] + offset_y,
+    sizex=sizex,
+    sizey=sizey,
+    sprites=True,
+)
+
+PAGE_CSS = """
+        body {
             margin: 0;
             padding: 20px;
             display: flex;
@@ -89,23 +82,30 @@ container_html = f"""<!DOCTYPE html>
             min-height: 100vh;
             background-color: #f5f5f5;
             font-family: Arial, sans-serif;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background-color: white;
             border-radius: 8px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
             padding: 20px;
             max-width: 100%;
             overflow: hidden;
-        }}
-    </style>
+        }
+"""
+
+with PageWriter("NFL_Teams_Chart.html") as page:
+    page.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    {style_tag(PAGE_CSS, "chart-page")}
 </head>
 <body>
     <div class="chart-container">
-        {plotly_html}
+        """)
+    page.write_figure(fig, "NFL_Teams_Chart", config={'staticPlot': False})
+    page.write(f"""
     </div>
+    {logo_sprites_script(fig)}
 </body>
-</html>"""
-
-with open("NFL_Teams_Chart.html", "w", encoding="utf-8") as f:
-    f.write(container_html)
+</html>""")
@@ -1,16 +1,14 @@
 import pandas as pd
 import plotly.graph_objects as go
-from pathlib import Path
-from PIL import Image
 import base64
-import json
+from assets import data_script, script_tag, style_tag
+from page import PageWriter, dump_json
+from team_data import load_teams
+from figure_builder import add_logos, logo_sprites_script, scatter_trace
 
 # --- Load data ---
-df = pd.read_csv("team_data_pop.csv")
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Chmp'] = df['Chmp'].astype(float)
+df = load_teams()
 df['Founded'] = df.get('Founded', pd.Series([1970]*len(df)))
-df['W-L%.1'] = df['W-L%.1'].astype(float)
 
 # Sample blurbs
 sample_blurbs = [
@@ -24,7 +22,7 @@ df['Blurb'] = [sample_blurbs[i % len(sample_blurbs)] for i in range(len(df))]
 
 # --- Prepare figure ---
 fig = go.Figure()
-fig.add_trace(go.Scatter(
+fig.add_trace(scatter_trace(
     x=df['TV_Homes'],
     y=df['Chmp'],
     mode='markers+text',
@@ -34,23 +32,8 @@ fig.add_trace(go.Scatter(
     hoverinfo='text'
 ))
 
-# Add logos
-logo_path = Path("NFL_Logos")
+# Logo size (fraction of the axis maximum)
 default_logo_scale = 0.1
-for _, row in df.iterrows():
-    png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"
-    if png_file.exists():
-        fig.add_layout_image(
-            x=row['TV_Homes'],
-            y=row['Chmp'],
-            source=Image.open(png_file),
-            xref="x",
-            yref="y",
-            sizex=default_logo_scale * df['TV_Homes'].max(),
-            sizey=default_logo_scale * df['Chmp'].max(),
-            xanchor="center",
-            yanchor="middle",
-        )
 
 fig.update_layout(
     title="NFL Teams: Market Size vs Championships",
@@ -61,6 +44,17 @@ fig.update_layout(
     margin=dict(l=80, r=80, t=80, b=80)
 )
 
+# Logos are pre-sized from the final layout
+add_logos(
+    fig,
+    df['Tm'],
+    x=df['TV_Homes'],
+    y=df['Chmp'],
+    sizex=default_logo_scale * df['TV_Homes'].max(),
+    sizey=default_logo_scale * df['Chmp'].max(),
+    sprites=True,
+)
+
 # --- Load video ---
 video_file = "Videos/test_video.mp4"
 with open(video_file, "rb") as f:
@@ -69,7 +63,7 @@ with open(video_file, "rb") as f:
 # Use 'From' column for founding year
 df['From'] = df.get('From', pd.Series([1970]*len(df)))
 
-team_data_json = json.dumps({
+team_data_json = dump_json({
     row["Tm"]: {
         "blurb": row["Blurb"],
         "winrate": float(row["W-L%.1"]),
@@ -78,48 +72,47 @@ team_data_json = json.dumps({
     for _, row in df.iterrows()
 })
 
-custom_html = f"""
-<style>
-#right-line, #bottom-line {{
+OVERLAY_CSS = """
+#right-line, #bottom-line {
     position: fixed;
     background-color: gray;
-}}
-#right-line {{
+}
+#right-line {
     top: 80px;
     right: 60px;
     width: 2px;
     height: 400px;
-}}
-#bottom-line {{
+}
+#bottom-line {
     left: 80px;
     bottom: 60px;
     width: 400px;
     height: 2px;
-}}
-.indicator-dot {{
+}
+.indicator-dot {
     position: fixed;
     width: 12px;
     height: 12px;
     border-radius: 50%;
     background-color: red;
     display: none;
-}}
-.indicator-label {{
+}
+.indicator-label {
     position: fixed;
     font-family: sans-serif;
     font-size: 14px;
     color: black;
     display: none;
-}}
-#hoverVideo {{
+}
+#hoverVideo {
     position: fixed;
     bottom: 20px;
     right: 20px;
     width: 320px;
     border-radius: 10px;
     display: none;
-}}
-#hoverCaption {{
+}
+#hoverCaption {
     position: fixed;
     bottom: 10px;
     right: 20px;
@@ -132,24 +125,12 @@ custom_html = f"""
     border-radius: 0 0 10px 10px;
     display: none;
     text-align: center;
-}}
-</style>
-
-<div id="right-line"></div>
-<div id="bottom-line"></div>
-<div id="right-dot" class="indicator-dot"></div>
-<div id="bottom-dot" class="indicator-dot"></div>
-<div id="right-label" class="indicator-label"></div>
-<div id="bottom-label" class="indicator-label"></div>
-
-<video id="hoverVideo" muted loop>
-    <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
-</video>
-<div id="hoverCaption"></div>
+}
+"""
 
-<script>
-document.addEventListener('DOMContentLoaded', function() {{
-    const teamData = {team_data_json};
+OVERLAY_JS = """
+document.addEventListener('DOMContentLoaded', function() {
+    const teamData = window.teamData;
 
     const minWin = Math.min(...Object.values(teamData).map(t => t.winrate));
     const maxWin = Math.max(...Object.values(teamData).map(t => t.winrate));
@@ -170,12 +151,12 @@ document.addEventListener('DOMContentLoaded', function() {{
     const plot = document.querySelector('.plotly');
     let currentTeam = null;
 
-    plot.addEventListener('mousemove', (e) => {{
+    plot.addEventListener('mousemove', (e) => {
         const hover = document.querySelector('.hoverlayer .hovertext');
-        if(hover){{
+        if(hover){
             const teamName = hover.textContent.trim();
             const team = teamData[teamName];
-            if(team && teamName !== currentTeam){{
+            if(team && teamName !== currentTeam){
                 currentTeam = teamName;
                 caption.textContent = team.blurb;
 
@@ -209,8 +190,8 @@ document.addEventListener('DOMContentLoaded', function() {{
                 video.style.display='block';
                 caption.style.display='block';
                 video.pause(); video.currentTime=0; video.play();
-            }}
-        }} else {{
+            }
+        } else {
             currentTeam = null;
             video.style.display='none';
             caption.style.display='none';
@@ -218,27 +199,43 @@ document.addEventListener('DOMContentLoaded', function() {{
             bottomDot.style.display='none';
             rightLabel.style.display='none';
             bottomLabel.style.display='none';
-        }}
-    }});
-}});
-</script>
+        }
+    });
+});
+"""
+
+custom_html = f"""
+{style_tag(OVERLAY_CSS, "hover-overlay-simple")}
+
+<div id="right-line"></div>
+<div id="bottom-line"></div>
+<div id="right-dot" class="indicator-dot"></div>
+<div id="bottom-dot" class="indicator-dot"></div>
+<div id="right-label" class="indicator-label"></div>
+<div id="bottom-label" class="indicator-label"></div>
+
+<video id="hoverVideo" muted loop>
+    <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
+</video>
+<div id="hoverCaption"></div>
+
+{data_script("teamData", team_data_json)}
+{script_tag(OVERLAY_JS, "hover-overlay-simple")}
 """
 
 
 
 # --- Export ---
-html_out = fig.to_html(include_plotlyjs=True, full_html=False)
-final_html = f"""
-<!DOCTYPE html>
+with PageWriter("NFL_Hover_Interactive.html") as page:
+    page.write("""<!DOCTYPE html>
 <html>
 <head><meta charset="utf-8"></head>
 <body>
-{html_out}
+""")
+    page.write_figure(fig, "NFL_Hover_Interactive")
+    page.write(f"""
+{logo_sprites_script(fig)}
 {custom_html}
 </body>
 </html>
-"""
-
-with open("NFL_Hover_Interactive.html", "w", encoding="utf-8") as f:
-    f.write(final_html)
-
+""")
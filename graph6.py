@@ -1,21 +1,16 @@
-import pandas as pd
 import plotly.graph_objects as go
-from pathlib import Path
-from PIL import Image
 import base64
-import json
+from assets import data_script, script_tag, style_tag
+from page import PageWriter, dump_json
+from team_data import load_teams
+from figure_builder import add_logos
+from media_manifest import PRELOAD_JS, file_info, team_assets
 
 # --- Load data ---
-df = pd.read_csv("team_data_pop.csv")
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Chmp'] = df['Chmp'].astype(float)
-df['W-L%.1'] = df['W-L%.1'].astype(float)
+df = load_teams()
 
 print(df)
 
-# --- Extract last word from team name for video ---
-df['VideoKey'] = df['Tm'].apply(lambda x: x.split()[-1])
-
 # --- Prepare figure ---
 fig = go.Figure()
 fig.add_trace(go.Scatter(
@@ -24,6 +19,7 @@ fig.add_trace(go.Scatter(
     #mode='markers',
    marker=dict(size=30),
    text=df['Tm'],
+   customdata=df['Tm'],
    hoverinfo='text',
 
 ))
@@ -35,43 +31,33 @@ fig.add_trace(go.Scatter(
 #    hoverinfo='text',
 #    ))
 
-# Add logos
-logo_path = Path("NFL_Logos")
-default_logo_scale = 0.1
-for _, row in df.iterrows():
-    png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"
-    if png_file.exists():
-        fig.add_layout_image(
-            x=row['Tm'],
-            y=row['Chmp'],
-            source=Image.open(png_file),
-            xref="x",
-            yref="y",
-            sizex=0.8,
-            sizey=0.8,
-            xanchor="center",
-            yanchor="middle",
-        )
-
 # --- Load video paths instead of embedding (much smaller HTML) ---
-video_path = Path("Videos")
+# Paths come from media_manifest.json; hover encodes (splitter.py --profile
+# hover) are preferred, posters come from Videos/posters.py
 team_videos = {}
-for _, row in df.iterrows():
-    video_file = video_path / f"{row['VideoKey']}.mp4"
-    if video_file.exists():
-        # Store the relative path for direct loading
-        team_videos[row['Tm']] = f"Videos/{row['VideoKey']}.mp4"
-    else:
-        team_videos[row['Tm']] = None
+team_videos_low = {}
+team_posters = {}
+for team in df['Tm']:
+    media = team_assets(team)
+    team_videos[team] = media.get("hover") or media.get("clip")
+    team_videos_low[team] = media.get("hover_low")
+    team_posters[team] = media.get("poster")
 
+# Client-side warm pool of hover videos: at most `size` loaded <video>
+# elements within `budgetBytes`, plus the `neighbours` nearest teams preloaded
+VIDEO_POOL = {"size": 6, "budgetBytes": 24 * 2**20, "neighbours": 2}
 
 
 # --- Prepare JSON for JS ---
-team_data_json = json.dumps({
+team_data_json = dump_json({
     row["Tm"]: {
         "winrate": float(row["W-L%.1"]),
         "founded": int(row["From"]),
         "video": team_videos[row["Tm"]],
+        "video_low": team_videos_low[row["Tm"]],
+        "video_bytes": file_info(team_videos[row["Tm"]]).get("bytes"),
+        "video_low_bytes": file_info(team_videos_low[row["Tm"]]).get("bytes"),
+        "poster": team_posters[row["Tm"]],
         "tv_homes": float(row["TV_Homes"]),
         "championships": float(row["Chmp"])
     }
@@ -79,9 +65,8 @@ team_data_json = json.dumps({
 })
 
 # --- Custom HTML/JS ---
-custom_html = f"""
-<style>
-body {{
+OVERLAY_CSS = """
+body {
     margin: 0;
     padding: 20px;
     background-color: #f8f9fa;
@@ -90,9 +75,9 @@ body {{
     justify-content: center;
     align-items: center;
     min-height: 100vh;
-}}
+}
 
-.container {{
+.container {
     max-width: 1200px;
     width: 100%;
     background-color: white;
@@ -101,33 +86,32 @@ body {{
     padding: 30px 100px 60px 30px;
     position: relative;
     transform-origin: center;
-}}
+}
 
-#right-line, #bottom-line {{
+#guide-layer {
     position: absolute;
-    background-color: gray;
+    left: 0;
+    top: 0;
     pointer-events: none;
     z-index: 1000;
-}}
-#right-line {{
-    width: 2px;
-    height: 0px;
-}}
-#bottom-line {{
-    width: 0px;
-    height: 2px;
-}}
-.indicator-dot {{
+}
+.indicator-dot {
     position: fixed;
+    left: 0;
+    top: 0;
+    will-change: transform;
     width: 12px;
     height: 12px;
     border-radius: 50%;
     background-color: red;
     display: none;
     z-index: 1000;
-}}
-.indicator-label {{
+}
+.indicator-label {
     position: fixed;
+    left: 0;
+    top: 0;
+    will-change: transform;
     font-family: sans-serif;
     font-size: 14px;
     color: black;
@@ -138,46 +122,36 @@ body {{
     border-radius: 4px;
     border: 1px solid #ccc;
     box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-}}
-.connecting-line {{
+}
+.connecting-line {
     position: fixed;
+    left: 0;
+    top: 0;
+    width: 1px;
+    will-change: transform;
     background-color: rgba(255, 0, 0, 0.6);
     height: 2px;
     display: none;
     pointer-events: none;
     z-index: 1000;
-}}
-.axis-label {{
-    position: absolute;
-    font-family: sans-serif;
-    font-size: 12px;
-    color: #666;
-    pointer-events: none;
-    z-index: 99999 !important;
-    background: white;
-    padding: 2px 4px;
-    border-radius: 3px;
-    border: 1px solid #ddd;
-    transform-origin: center;
-}}
-
+}
 /* Ensure all interactive elements scale with the container */
-.container * {{
+.container * {
     transform-origin: center;
-}}
+}
 
 /* Make sure the plotly container scales properly */
-.plotly {{
+.plotly {
     transform-origin: center;
-}}
-#hoverVideo {{
+}
+#hoverVideo, .hover-video {
     position: fixed;
     width: 320px;
     border-radius: 10px;
     display: none;
     z-index: 10000;
-}}
-#hoverCaption {{
+}
+#hoverCaption {
     position: fixed;
     background: rgba(0,0,0,0.7);
     color: white;
@@ -189,50 +163,14 @@ body {{
     z-index: 10001;
     display: none;
     width: 305px;
-}}
-
-.axis-title {{
-    position: absolute;
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    font-size: 16px;       /* bigger than tick labels */
-    font-weight: 700;       /* bold */
-    color: #111;            /* darker text */
-    background: #fff;
-    padding: 6px 10px;
-    border-radius: 6px;
-    border: 2px solid #555;
-    box-shadow: 0 4px 10px rgba(0,0,0,0.2);
-    z-index: 100001 !important;
-    pointer-events: none;
-}}
-
-
-</style>
-
-<div id="right-line"></div>
-<div id="bottom-line"></div>
-<div id="right-dot" class="indicator-dot"></div>
-<div id="bottom-dot" class="indicator-dot"></div>
-<div id="right-label" class="indicator-label"></div>
-<div id="bottom-label" class="indicator-label"></div>
-<div id="line-to-right" class="connecting-line"></div>
-<div id="line-to-bottom" class="connecting-line"></div>
-<div id="line-to-right-label" class="axis-title">Win %</div>
-<div id="line-to-bottom-label" class="axis-title">Founded Year</div>
-
-<!-- Axis labels containers -->
-<div id="right-axis-labels"></div>
-<div id="bottom-axis-labels"></div>
+}
 
 
-<video id="hoverVideo" loop>
-    <source src="" type="video/mp4">
-</video>
-<div id="hoverCaption"></div>
+"""
 
-<script>
-document.addEventListener('DOMContentLoaded', function() {{
-    const teamData = {team_data_json};
+OVERLAY_JS = """
+document.addEventListener('DOMContentLoaded', function() {
+    const teamData = window.teamData;
 
     const minWin = Math.min(...Object.values(teamData).map(t => t.winrate));
     const maxWin = Math.max(...Object.values(teamData).map(t => t.winrate));
@@ -245,7 +183,6 @@ document.addEventListener('DOMContentLoaded', function() {{
     const minChmp = Math.min(...Object.values(teamData).map(t => t.championships));
     const maxChmp = Math.max(...Object.values(teamData).map(t => t.championships));
 
-    const video = document.getElementById('hoverVideo');
     const caption = document.getElementById('hoverCaption');
 
     const rightDot = document.getElementById('right-dot');
@@ -253,328 +190,375 @@ document.addEventListener('DOMContentLoaded', function() {{
     const rightLabel = document.getElementById('right-label');
     const bottomLabel = document.getElementById('bottom-label');
 
-    const rightLine = document.getElementById('right-line');
-    const bottomLine = document.getElementById('bottom-line');
-    
     const lineToRight = document.getElementById('line-to-right');
     const lineToBottom = document.getElementById('line-to-bottom');
-    
-    const rightAxisLabels = document.getElementById('right-axis-labels');
-    const bottomAxisLabels = document.getElementById('bottom-axis-labels');
+    [lineToRight, lineToBottom].forEach(line => { line.style.transformOrigin = '0 0'; });
 
-    const plot = document.querySelector('.plotly');
+    const gd = document.querySelector('.plotly-graph-div');
+    const container = document.querySelector('.container');
     let currentTeam = null;
 
-    // Function to update reference lines based on plot bounds
-    function updateReferenceLines() {{
-        // Get the main plotly container
-        const plotlyContainer = document.querySelector('.plotly');
-        if (!plotlyContainer) return;
-        
-        // Get the container for relative positioning
-        const container = document.querySelector('.container');
-        if (!container) return;
-        
-        // Get the SVG element which contains the actual plot area
-        const svg = plotlyContainer.querySelector('svg');
-        if (!svg) return;
-        
-        // Find the actual plot area by looking for the main plot group
-        const plotArea = svg.querySelector('.plotly .main-svg .plotly .plot');
-        if (!plotArea) {{
-            // Fallback: try to find the main plot group
-            const mainPlot = svg.querySelector('.plotly .plot');
-            if (mainPlot) {{
-                const plotRect = mainPlot.getBoundingClientRect();
-                const containerRect = container.getBoundingClientRect();
-                const relativeRect = {{
-                    left: plotRect.left - containerRect.left,
-                    right: plotRect.right - containerRect.left,
-                    top: plotRect.top - containerRect.top,
-                    bottom: plotRect.bottom - containerRect.top,
-                    width: plotRect.width,
-                    height: plotRect.height
-                }};
-                positionLines(relativeRect);
-                createAxisLabels(relativeRect);
-
-                return;
-            }}
-            
-        }}
-        
-        if (plotArea) {{
-            const plotRect = plotArea.getBoundingClientRect();
-            const containerRect = container.getBoundingClientRect();
-            const relativeRect = {{
-                left: plotRect.left - containerRect.left,
-                right: plotRect.right - containerRect.left,
-                top: plotRect.top - containerRect.top,
-                bottom: plotRect.bottom - containerRect.top,
-                width: plotRect.width,
-                height: plotRect.height
-            }};
-            positionLines(relativeRect);
-            createAxisLabels(relativeRect);
-        }} else {{
-            // Final fallback: use SVG with margins
-            const svgRect = svg.getBoundingClientRect();
-            const containerRect = container.getBoundingClientRect();
-            const margin = 60; // Approximate margin
-            const relativeRect = {{
-                left: (svgRect.left - containerRect.left) + margin,
-                right: (svgRect.right - containerRect.left) - margin,
-                top: (svgRect.top - containerRect.top) + margin,
-                bottom: (svgRect.bottom - containerRect.top) - margin,
-                width: svgRect.width - 2 * margin,
-                height: svgRect.height - 2 * margin
-            }};
-            positionLines(relativeRect);
-            createAxisLabels(relativeRect);
-        }}
-    }}
-    
-    // Function to position the reference lines
-    function positionLines(plotRect) {{
-        const offset = 80; // Distance from the plot area
-
-        const container = document.querySelector('.container');
-        const containerRect = container.getBoundingClientRect();
-        const containerWidth = containerRect.width;
-        const containerHeight = containerRect.height;
-
-        // --- Position right line ---
-        const rightLineLeft = Math.min(plotRect.right + offset, containerWidth - 10);
-        rightLine.style.left = rightLineLeft + 'px';
-        rightLine.style.top = plotRect.top + 'px';
-        rightLine.style.height = plotRect.height + 'px';
-
-        // --- Position bottom line ---
-        const bottomLineTop = Math.min(plotRect.bottom + offset, containerHeight - 10);
-        bottomLine.style.left = plotRect.left + 'px';
-        bottomLine.style.top = bottomLineTop + 'px';
-        bottomLine.style.width = plotRect.width + 'px';
-
-        // --- Position static axis labels ---
-        const lineRightLabel = document.getElementById('line-to-right-label');
-        const lineBottomLabel = document.getElementById('line-to-bottom-label');
-
-        if (lineRightLabel && lineBottomLabel) {{
-            // Right axis label: vertically centered along the right line
-            lineRightLabel.style.left = (rightLineLeft + 5) + 'px'; // small spacing from the line
-            lineRightLabel.style.top = (plotRect.top + plotRect.height / 2 - lineRightLabel.offsetHeight / 2) + 'px';
-            lineRightLabel.style.display = 'block';
-
-            // Bottom axis label: horizontally centered below the bottom line
-            lineBottomLabel.style.left = (plotRect.left + plotRect.width / 2 - lineBottomLabel.offsetWidth / 2) + 'px';
-            lineBottomLabel.style.top = (bottomLineTop + 5) + 'px'; // small spacing below the line
-            lineBottomLabel.style.transform = 'rotate(0deg)';
-            lineBottomLabel.style.display = 'block';
-        }}
-    }}
+    // --- Guide axes (Win % / Founded Year) ---
+    // Lines, tick labels and titles are painted on one canvas, with positions
+    // taken from Plotly's axis objects. Repainted only after a debounced
+    // relayout or resize.
+    const guideCanvas = document.getElementById('guide-layer');
+    const GUIDE_OFFSET = 80;  // distance from the plot area
+    const TICK_STYLE = { font: '12px sans-serif', size: 12, padX: 4, padY: 2, radius: 3,
+                         color: '#666', border: '#ddd', borderWidth: 1 };
+    const TITLE_STYLE = { font: "bold 16px 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", size: 16,
+                          padX: 10, padY: 6, radius: 6, color: '#111', border: '#555', borderWidth: 2,
+                          shadow: 'rgba(0, 0, 0, 0.2)' };
+    let guides = null;
+    let guideTimer = 0;
+
+    function computeGuides() {
+        // Plot area in container coordinates
+        const xa = gd._fullLayout.xaxis;
+        const ya = gd._fullLayout.yaxis;
+        const rect = gd.getBoundingClientRect();
+        const crect = container.getBoundingClientRect();
+        const left = rect.left - crect.left + xa._offset;
+        const top = rect.top - crect.top + ya._offset;
+        return {
+            width: crect.width,
+            height: crect.height,
+            left: left,
+            top: top,
+            plotWidth: xa._length,
+            plotHeight: ya._length,
+            rightX: Math.min(left + xa._length + GUIDE_OFFSET, crect.width - 10),
+            bottomY: Math.min(top + ya._length + GUIDE_OFFSET, crect.height - 10)
+        };
+    }
 
-    
-    // Function to create numerical labels along the axes
-    function createAxisLabels(plotRect) {{
-        // Clear existing labels
-        rightAxisLabels.innerHTML = '';
-        bottomAxisLabels.innerHTML = '';
-        
-        // Get container bounds for safe positioning
-        const container = document.querySelector('.container');
-        const containerRect = container.getBoundingClientRect();
-        const containerWidth = containerRect.width;
-        const containerHeight = containerRect.height;
-        const offset = 80;
-        
-        // Create labels for right axis (Win %)
-        const winSteps = 5; // Number of steps from min to max
-        for (let i = 0; i <= winSteps; i++) {{
+    function labelSize(ctx, text, style) {
+        ctx.font = style.font;
+        return [ctx.measureText(text).width + 2 * style.padX, Math.round(style.size * 1.2) + 2 * style.padY];
+    }
+
+    function drawLabel(ctx, text, x, y, style) {
+        const [w, h] = labelSize(ctx, text, style);
+        ctx.save();
+        if (style.shadow) {
+            ctx.shadowColor = style.shadow;
+            ctx.shadowBlur = 10;
+            ctx.shadowOffsetY = 4;
+        }
+        ctx.beginPath();
+        if (ctx.roundRect) ctx.roundRect(x, y, w, h, style.radius); else ctx.rect(x, y, w, h);
+        ctx.fillStyle = '#fff';
+        ctx.fill();
+        ctx.restore();
+        ctx.lineWidth = style.borderWidth;
+        ctx.strokeStyle = style.border;
+        ctx.stroke();
+        ctx.fillStyle = style.color;
+        ctx.textBaseline = 'middle';
+        ctx.fillText(text, x + style.padX, y + h / 2);
+    }
+
+    function drawGuides() {
+        guideTimer = 0;
+        guides = computeGuides();
+        const g = guides;
+        const dpr = window.devicePixelRatio || 1;
+        guideCanvas.width = Math.round(g.width * dpr);
+        guideCanvas.height = Math.round(g.height * dpr);
+        guideCanvas.style.width = g.width + 'px';
+        guideCanvas.style.height = g.height + 'px';
+        const ctx = guideCanvas.getContext('2d');
+        ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+
+        ctx.fillStyle = 'gray';
+        ctx.fillRect(g.rightX, g.top, 2, g.plotHeight);
+        ctx.fillRect(g.left, g.bottomY, g.plotWidth, 2);
+
+        // Win % labels along the right line
+        const winSteps = 5;
+        for (let i = 0; i <= winSteps; i++) {
             const winValue = minWin + (maxWin - minWin) * (i / winSteps);
-            const label = document.createElement('div');
-            label.className = 'axis-label';
-            label.textContent = (winValue * 100).toFixed(1) + '%';
-            
-            // Position along the right line with boundary checking
-            const yPos = plotRect.top + (plotRect.height * (winSteps - i) / winSteps);
-            const rightLineLeft = Math.min(plotRect.right + offset, containerWidth - 10);
-            label.style.left = (rightLineLeft + 5) + 'px'; // 5px spacing from line
-            label.style.top = (yPos - 8) + 'px';
-            
-            rightAxisLabels.appendChild(label);
-        }}
-        
-        // Create labels for bottom axis (Founded Year) - every 10 years
-        const startYear = Math.ceil(minYear / 10) * 10; // Round up to nearest 10
-        const endYear = Math.floor(maxYear / 10) * 10;   // Round down to nearest 10
-        
-        for (let year = startYear; year <= endYear; year += 10) {{
-            // Only show if within the actual data range
-            if (year >= minYear && year <= maxYear) {{
-                const label = document.createElement('div');
-                label.className = 'axis-label';
-                label.textContent = year.toString();
-                
-                // Calculate position based on the year's position in the range
-                const yearPosition = (year - minYear) / (maxYear - minYear);
-                const xPos = plotRect.left + (plotRect.width * yearPosition);
-                const bottomLineTop = Math.min(plotRect.bottom + offset, containerHeight - 10);
-                label.style.left = (xPos - 15) + 'px';
-                label.style.top = (bottomLineTop - 25) + 'px'; // 25px above the line (consistent with dynamic labels)
-                
-                bottomAxisLabels.appendChild(label);
-            }}
-        }}
-    }}
-
-    // Update lines when plot is ready, resized, zoomed, or panned
-    plot.addEventListener('plotly_afterplot', updateReferenceLines);
-    plot.addEventListener('plotly_relayout', updateReferenceLines);
-    plot.addEventListener('plotly_redraw', updateReferenceLines);
-    window.addEventListener('resize', updateReferenceLines);
-    
-    // Initial positioning with multiple attempts to ensure proper setup
-    setTimeout(updateReferenceLines, 100);
-    setTimeout(updateReferenceLines, 500);
-    setTimeout(updateReferenceLines, 1000);
-
-    plot.addEventListener('mousemove', (e) => {{
-        const hover = document.querySelector('.hoverlayer .hovertext');
-        if(hover){{
-            const teamName = hover.textContent.trim();
-            const team = teamData[teamName];
-            if(team && teamName !== currentTeam){{
-                currentTeam = teamName;
-                caption.textContent = "Video de campeonato más reciente";
-                
-                // Small delay to ensure line dimensions are calculated
-                setTimeout(() => {{
-
-                // --- Position right dot (Win %) ---
-                const winNorm = (team.winrate - minWin)/(maxWin - minWin);
-                const rightLineRect = rightLine.getBoundingClientRect();
-                const rightTop = rightLineRect.top;
-                const rightHeight = rightLineRect.height;
-                // For a vertical line, the center is at the left edge + half the line width
-                const rightCenter = rightLineRect.left + (rightLineRect.width / 2);
-                rightDot.style.top = rightTop + rightHeight - winNorm*rightHeight - rightDot.offsetHeight/2 + 'px';
-                rightDot.style.left = rightCenter - rightDot.offsetWidth/2 + 'px'; // Center on the line
-                rightDot.style.display = 'block';
-                
-                // Ensure dot is perfectly centered with a small adjustment
-                const dotLeft = rightCenter - rightDot.offsetWidth/2;
-                rightDot.style.left = dotLeft + 'px';
-
-                rightLabel.style.top = rightTop + rightHeight - winNorm*rightHeight - rightLabel.offsetHeight/2 + 'px';
-                rightLabel.style.left = rightLineRect.left + 15 + 'px';
-                rightLabel.textContent = (team.winrate * 100).toFixed(1) + '%';
-                rightLabel.style.display = 'block';
-
-                // --- Position bottom dot (Founded Year) ---
-                const yearNorm = (team.founded - minYear)/(maxYear - minYear);
-                const bottomLineRect = bottomLine.getBoundingClientRect();
-                const bottomLeft = bottomLineRect.left;
-                const bottomWidth = bottomLineRect.width;
-                // For a horizontal line, the center is at the top edge + half the line height
-                const bottomCenter = bottomLineRect.top + (bottomLineRect.height / 2);
-                bottomDot.style.left = bottomLeft + yearNorm*bottomWidth - bottomDot.offsetWidth/2 + 'px';
-                bottomDot.style.top = bottomCenter - bottomDot.offsetHeight/2 + 'px'; // Center on the line
-                bottomDot.style.display = 'block';
-                
-                // Ensure dot is perfectly centered with a small adjustment
-                const dotTop = bottomCenter - bottomDot.offsetHeight/2;
-                bottomDot.style.top = dotTop + 'px';
-
-                // Position year label at consistent height above the red dot
-                bottomLabel.style.left = bottomLeft + yearNorm*bottomWidth - bottomLabel.offsetWidth/2 + 'px';
-                bottomLabel.style.top = (dotTop - 25) + 'px'; // Always 25px above the red dot
-                bottomLabel.textContent = team.founded;
-                bottomLabel.style.display = 'block';
-
-                // --- Create connecting lines ---
-                // Find all scatter plot points and get the one being hovered
-                const scatterPoints = plot.querySelectorAll('.scatterlayer .point');
-                let logoX = e.clientX;
-                let logoY = e.clientY;
-                
-                // Try to find the exact point element being hovered
-                scatterPoints.forEach(point => {{
-                    const rect = point.getBoundingClientRect();
-                    const centerX = rect.left + rect.width / 2;
-                    const centerY = rect.top + rect.height / 2;
-                    
-                    // Check if this point is close to our hover position
-                    const distance = Math.sqrt(Math.pow(centerX - e.clientX, 2) + Math.pow(centerY - e.clientY, 2));
-                    if (distance < 50) {{ // Within 50 pixels
-                        logoX = centerX;
-                        logoY = centerY;
-                    }}
-                }});
-                
-                // Line to right dot (winning percentage)
-                const rightDotX = rightDot.getBoundingClientRect().left + rightDot.offsetWidth/2;
-                const rightDotY = rightDot.getBoundingClientRect().top + rightDot.offsetHeight/2;
-                
-                const rightLineLength = Math.sqrt(Math.pow(rightDotX - logoX, 2) + Math.pow(rightDotY - logoY, 2));
-                const rightLineAngle = Math.atan2(rightDotY - logoY, rightDotX - logoX) * 180 / Math.PI;
-                
-                lineToRight.style.left = logoX + 'px';
-                lineToRight.style.top = logoY + 'px';
-                lineToRight.style.width = rightLineLength + 'px';
-                lineToRight.style.transform = `rotate(${{rightLineAngle}}deg)`;
-                lineToRight.style.transformOrigin = '0 0';
-                lineToRight.style.display = 'block';
-                
-                // Line to bottom dot (founded year)
-                const bottomDotX = bottomDot.getBoundingClientRect().left + bottomDot.offsetWidth/2;
-                const bottomDotY = bottomDot.getBoundingClientRect().top + bottomDot.offsetHeight/2;
-                
-                const bottomLineLength = Math.sqrt(Math.pow(bottomDotX - logoX, 2) + Math.pow(bottomDotY - logoY, 2));
-                const bottomLineAngle = Math.atan2(bottomDotY - logoY, bottomDotX - logoX) * 180 / Math.PI;
-                
-                lineToBottom.style.left = logoX + 'px';
-                lineToBottom.style.top = logoY + 'px';
-                lineToBottom.style.width = bottomLineLength + 'px';
-                lineToBottom.style.transform = `rotate(${{bottomLineAngle}}deg)`;
-                lineToBottom.style.transformOrigin = '0 0';
-                lineToBottom.style.display = 'block';
-
-                // --- Show video and caption ---
-                if(team.video){{
-                    video.src = team.video;
-                    video.load();
-                    video.play();
-                    const videoWidth = video.offsetWidth;
-                    const offset = 20;
-
-                    video.style.left = (e.clientX - 320 - offset) + 'px';
-                    video.style.top = (e.clientY - 220 - offset) + 'px';
-                    video.style.display = 'block'; // display first
-                    setTimeout(() => {{
-                        const videoRect = video.getBoundingClientRect();
-                        caption.style.left = videoRect.left + 'px';
-                        caption.style.top = (videoRect.bottom + 5) + 'px';
-                        caption.style.display = 'block';
-                    }}, 50);
-                }}
-                }}, 10); // End setTimeout
-            }}
-        }} else {{
-            currentTeam = null;
-            video.pause();
-            video.currentTime=0;
-            video.style.display='none';
-            caption.style.display='none';
-            rightDot.style.display='none';
-            bottomDot.style.display='none';
-            rightLabel.style.display='none';
-            bottomLabel.style.display='none';
-            lineToRight.style.display='none';
-            lineToBottom.style.display='none';
-        }}
-    }});
-}});
-</script>
+            const y = g.top + g.plotHeight * (winSteps - i) / winSteps;
+            drawLabel(ctx, (winValue * 100).toFixed(1) + '%', g.rightX + 5, y - 8, TICK_STYLE);
+        }
+
+        // Founded Year labels every 10 years, inside the data range
+        for (let year = Math.ceil(minYear / 10) * 10; year <= maxYear; year += 10) {
+            const x = g.left + g.plotWidth * (year - minYear) / (maxYear - minYear);
+            drawLabel(ctx, year.toString(), x - 15, g.bottomY - 25, TICK_STYLE);
+        }
+
+        const [, titleHeight] = labelSize(ctx, 'Win %', TITLE_STYLE);
+        drawLabel(ctx, 'Win %', g.rightX + 5, g.top + g.plotHeight / 2 - titleHeight / 2, TITLE_STYLE);
+        const [titleWidth] = labelSize(ctx, 'Founded Year', TITLE_STYLE);
+        drawLabel(ctx, 'Founded Year', g.left + g.plotWidth / 2 - titleWidth / 2, g.bottomY + 5, TITLE_STYLE);
+    }
+
+    function scheduleGuides() {
+        guides = null;  // hover measures fresh until the repaint lands
+        invalidateGeometry();
+        clearTimeout(guideTimer);
+        guideTimer = setTimeout(drawGuides, 100);
+    }
+
+    // --- Warm pool of hover videos ---
+    // Loaded <video> elements are kept in a Map in least-recently-used order
+    // and evicted past the configured count or byte budget. The element on
+    // screen is never evicted.
+    const poolConfig = Object.assign({ size: 6, budgetBytes: 24 << 20, neighbours: 2 }, window.videoPoolConfig);
+    const DEFAULT_CLIP_BYTES = 2 << 20;
+    const idle = window.requestIdleCallback || (cb => setTimeout(cb, 50));
+    const template = document.getElementById('hoverVideo');
+    const videoPool = new Map();
+    let poolBytes = 0;
+    let video = null;
+
+    function videoSource(team) {
+        // Low-bitrate rendition when the browser asks to save data
+        const saveData = navigator.connection && navigator.connection.saveData;
+        if (saveData && team.video_low) return [team.video_low, team.video_low_bytes];
+        return [team.video, team.video_bytes];
+    }
+
+    function pooledVideo(team) {
+        const [src, bytes] = videoSource(team);
+        let entry = videoPool.get(src);
+        if (entry) {
+            videoPool.delete(src);  // re-inserted below as most recently used
+        } else {
+            const el = template.cloneNode(false);
+            el.removeAttribute('id');
+            el.className = 'hover-video';
+            el.preload = 'auto';
+            el.poster = team.poster || '';
+            el.src = src;
+            template.parentNode.insertBefore(el, template);
+            entry = { el: el, bytes: bytes || DEFAULT_CLIP_BYTES };
+            poolBytes += entry.bytes;
+        }
+        videoPool.set(src, entry);
+        evict(src);
+        return entry.el;
+    }
+
+    function evict(keep) {
+        for (const [src, entry] of videoPool) {
+            if (videoPool.size <= poolConfig.size && poolBytes <= poolConfig.budgetBytes) break;
+            if (src === keep || entry.el === video) continue;
+            videoPool.delete(src);
+            poolBytes -= entry.bytes;
+            entry.el.pause();
+            entry.el.removeAttribute('src');
+            entry.el.load();  // releases the buffered media
+            entry.el.remove();
+        }
+    }
+
+    function preloadNeighbours(state) {
+        // Teams whose logos are closest to the hovered one, from the cached geometry
+        const k = Math.min(poolConfig.neighbours, poolConfig.size - 1);
+        const xy = geometry && geometry.points[state.curve];
+        const names = gd._fullData[state.curve].customdata;
+        if (k <= 0 || !xy || !names) return;
+        const x0 = xy[2 * state.index];
+        const y0 = xy[2 * state.index + 1];
+        const nearest = [];
+        for (let i = 0; i < names.length; i++) {
+            const team = teamData[names[i]];
+            if (i === state.index || !team || !team.video) continue;
+            const d = (xy[2 * i] - x0) ** 2 + (xy[2 * i + 1] - y0) ** 2;
+            if (nearest.length < k || d < nearest[nearest.length - 1][0]) {
+                nearest.push([d, team]);
+                nearest.sort((a, b) => a[0] - b[0]);
+                if (nearest.length > k) nearest.pop();
+            }
+        }
+        nearest.forEach(([, team]) => pooledVideo(team));
+    }
+
+    // --- Hover pipeline ---
+    // Plotly tells us which point is hovered (customdata holds the team).
+    // Screen positions of the points and guide lines are measured once per
+    // layout, and all DOM writes for a hover happen in one animation frame.
+    let geometry = null;
+    let pending = null;
+    let frame = 0;
+
+    function invalidateGeometry() {
+        geometry = null;
+    }
+
+    function measureGeometry() {
+        const layout = gd._fullLayout;
+        const xa = layout.xaxis;
+        const ya = layout.yaxis;
+        const rect = gd.getBoundingClientRect();
+        // Client coordinates of every point, per trace
+        const points = gd._fullData.map(trace => {
+            const n = trace.x ? trace.x.length : 0;
+            const xy = new Float64Array(2 * n);
+            for (let i = 0; i < n; i++) {
+                xy[2 * i] = rect.left + xa._offset + xa.d2p(trace.x[i]);
+                xy[2 * i + 1] = rect.top + ya._offset + ya.d2p(trace.y[i]);
+            }
+            return xy;
+        });
+        // Guide lines in client coordinates (centre of the 2px lines)
+        if (!guides) guides = computeGuides();
+        const crect = container.getBoundingClientRect();
+        return {
+            points: points,
+            rightX: crect.left + guides.rightX + 1,
+            bottomY: crect.top + guides.bottomY + 1,
+            left: crect.left + guides.left,
+            top: crect.top + guides.top,
+            plotWidth: guides.plotWidth,
+            plotHeight: guides.plotHeight
+        };
+    }
+
+    function schedule(state) {
+        pending = state;
+        if (!frame) frame = requestAnimationFrame(render);
+    }
+
+    // Overlay elements sit at (0, 0) and only ever move with transforms,
+    // which the compositor handles without a layout pass
+    function moveTo(el, x, y, align) {
+        el.style.transform = `translate(${x}px, ${y}px) ${align}`;
+        el.style.display = 'block';
+    }
+
+    function placeLine(line, x0, y0, x1, y1) {
+        // A 1px wide line stretched to length
+        const length = Math.hypot(x1 - x0, y1 - y0);
+        const angle = Math.atan2(y1 - y0, x1 - x0);
+        line.style.transform = `translate(${x0}px, ${y0}px) rotate(${angle}rad) scaleX(${length})`;
+        line.style.display = 'block';
+    }
+
+    function hideVideo() {
+        if (!video) return;
+        video.pause();
+        video.currentTime = 0;
+        video.style.display = 'none';
+        video = null;
+    }
+
+    function hideOverlay() {
+        currentTeam = null;
+        hideVideo();
+        [caption, rightDot, bottomDot, rightLabel, bottomLabel, lineToRight, lineToBottom]
+            .forEach(el => { el.style.display = 'none'; });
+    }
+
+    function render() {
+        frame = 0;
+        const state = pending;
+        if (!state) {
+            if (currentTeam !== null) hideOverlay();
+            return;
+        }
+        if (state.team === currentTeam) return;
+        const team = teamData[state.team];
+        if (!team) return;
+        currentTeam = state.team;
+
+        // Reads (cached between relayouts) before any writes
+        if (!geometry) geometry = measureGeometry();
+        const g = geometry;
+        const xy = g.points[state.curve];
+        const logoX = xy ? xy[2 * state.index] : state.clientX;
+        const logoY = xy ? xy[2 * state.index + 1] : state.clientY;
+
+        caption.textContent = "Video de campeonato más reciente";
+
+        // --- Right dot (Win %) ---
+        const winNorm = (team.winrate - minWin) / (maxWin - minWin);
+        const rightY = g.top + g.plotHeight - winNorm * g.plotHeight;
+        moveTo(rightDot, g.rightX, rightY, 'translate(-50%, -50%)');
+        rightLabel.textContent = (team.winrate * 100).toFixed(1) + '%';
+        moveTo(rightLabel, g.rightX + 14, rightY, 'translateY(-50%)');
+
+        // --- Bottom dot (Founded Year), label 25px above the dot ---
+        const yearNorm = (team.founded - minYear) / (maxYear - minYear);
+        const bottomX = g.left + yearNorm * g.plotWidth;
+        moveTo(bottomDot, bottomX, g.bottomY, 'translate(-50%, -50%)');
+        bottomLabel.textContent = team.founded;
+        moveTo(bottomLabel, bottomX, g.bottomY - 6 - 25, 'translateX(-50%)');
+
+        // --- Connecting lines from the logo to both dots ---
+        placeLine(lineToRight, logoX, logoY, g.rightX, rightY);
+        placeLine(lineToBottom, logoX, logoY, bottomX, g.bottomY);
+
+        // --- Show video and caption ---
+        if (team.video) {
+            const next = pooledVideo(team);
+            if (next !== video) hideVideo();
+            video = next;
+            video.play().catch(() => {});
+            const offset = 20;
+            const left = state.clientX - 320 - offset;
+            const top = state.clientY - 220 - offset;
+            // #hoverVideo is 320px wide; assume 16:9 until metadata is known
+            const height = video.videoWidth ? 320 * video.videoHeight / video.videoWidth : 180;
+            video.style.left = left + 'px';
+            video.style.top = top + 'px';
+            video.style.display = 'block';
+            caption.style.left = left + 'px';
+            caption.style.top = (top + height + 5) + 'px';
+            caption.style.display = 'block';
+            idle(() => preloadNeighbours(state));
+        } else {
+            hideVideo();
+            caption.style.display = 'none';
+        }
+    }
+
+    gd.on('plotly_hover', function(data) {
+        const pt = data.points[0];
+        schedule({
+            team: pt.customdata !== undefined ? pt.customdata : pt.text,
+            curve: pt.curveNumber,
+            index: pt.pointNumber,
+            clientX: data.event ? data.event.clientX : 0,
+            clientY: data.event ? data.event.clientY : 0
+        });
+    });
+    gd.on('plotly_unhover', function() {
+        schedule(null);
+    });
+
+    // Positions only change with the layout (or, for the hover overlay, scrolling)
+    gd.on('plotly_relayout', scheduleGuides);
+    gd.on('plotly_afterplot', scheduleGuides);
+    window.addEventListener('resize', scheduleGuides);
+    window.addEventListener('scroll', invalidateGeometry, { passive: true });
+    drawGuides();
+});
+"""
+
+custom_html = f"""
+{style_tag(OVERLAY_CSS, "hover-overlay")}
+
+<canvas id="guide-layer"></canvas>
+<div id="right-dot" class="indicator-dot"></div>
+<div id="bottom-dot" class="indicator-dot"></div>
+<div id="right-label" class="indicator-label"></div>
+<div id="bottom-label" class="indicator-label"></div>
+<div id="line-to-right" class="connecting-line"></div>
+<div id="line-to-bottom" class="connecting-line"></div>
+
+
+<video id="hoverVideo" loop>
+    <source src="" type="video/mp4">
+</video>
+<div id="hoverCaption"></div>
+
+{data_script("teamData", team_data_json)}
+{data_script("videoPoolConfig", dump_json(VIDEO_POOL))}
+{script_tag(OVERLAY_JS, "hover-overlay")}
+{script_tag(PRELOAD_JS, "media-preload")}
 """
 
 fig.update_layout(
@@ -592,26 +576,28 @@ fig.update_layout(
     yaxis_title_font_color="#333"
 )
 
+# Logos are pre-sized from the final layout
+add_logos(fig, df['Tm'], x=df['Tm'], y=df['Chmp'], sizex=0.8, sizey=0.8)
+
 # --- Export final HTML ---
-html_out = fig.to_html(include_plotlyjs=True, full_html=False)
-final_html = f"""
-<!DOCTYPE html>
+with PageWriter("NFL_Hover_Interactive.html") as page:
+    page.write("""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>NFL Teams: TV Market Size vs Championships Won</title>
+    <link rel="preload" as="fetch" href="media_manifest.json" crossorigin="anonymous">
 </head>
 <body>
     <div class="container">
-        {html_out}
+        """)
+    page.write_figure(fig, "NFL_Hover_Interactive")
+    page.write(f"""
         {custom_html}
     </div>
 </body>
 </html>
-"""
-
-with open("NFL_Hover_Interactive.html", "w", encoding="utf-8") as f:
-    f.write(final_html)
+""")
 
 print("HTML with interactive hover videos generated!")
@@ -1,18 +1,20 @@
-import pandas as pd
 import plotly.graph_objects as go
-from PIL import Image
-from pathlib import Path
 import numpy as np
 import base64
 import json
+from fractions import Fraction
+from pathlib import Path
+from assets import data_script, script_tag, style_tag
+from page import PageWriter, dump_json
+from team_data import load_teams
+from figure_builder import add_logos
+from media_manifest import team_assets
 
 
 # Load data
-df = pd.read_csv("team_data_pop.csv")
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Population'] = df['Population'].astype(float)
+df = load_teams()
 
-df.sort_values(by='Chmp', ascending=True, inplace=True)
+df.sort_values(by='Chmp', ascending=True, kind='stable', inplace=True)
 
 lista = list(df[["Tm", "Chmp"]].itertuples(index=False, name=None))
 print(lista)
@@ -36,32 +38,6 @@ fig.add_trace(go.Bar(
     
 )))
 
-logo_path = Path("NFL_Logos")  
-min_logo = 0.1
-max_logo = 0.3
-
-# Scale win loss percentage
-
-# Exaggerate differences by raising to a power (>1)
-exp_factor = 2.5  # tweak between 2–3 for more exaggeration
-
-for idx, row in df.iterrows():
-    png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"  
-    if png_file.exists():
-            normalized = (row["W-L%.1"] - df["W-L%.1"].min()) / (df["W-L%.1"].max() - df["W-L%.1"].min())
-            scale = min_logo + (normalized ** exp_factor) * (max_logo - min_logo)
-            fig.add_layout_image(
-                x= -0.5 ,
-                y=row['Tm'],
-                source=Image.open(png_file),
-                xref="x",
-                yref="y",
-                sizex= 1.3,
-                sizey= 1.3,
-                xanchor="center",
-                yanchor="middle",
-            )
-
 fig.update_layout(
     clickmode='event+select',   # permite seleccionar en hover/click
     hovermode='closest'
@@ -94,31 +70,92 @@ fig.update_layout(
    margin=dict(l=80, r=50, t=120, b=80)
 )
 
-# --- Extract last word from team name for video ---
-df['VideoKey'] = df['Tm'].apply(lambda x: x.split()[-1])
+# Logos are pre-sized from the final layout
+add_logos(fig, df['Tm'], x=-0.5, y=df['Tm'], sizex=1.3, sizey=1.3)
 
 # --- Load video paths instead of embedding (much smaller HTML) ---
-video_path = Path("Videos")
-team_videos = {}
-for _, row in df.iterrows():
-    video_file = video_path / f"{row['VideoKey']}.mp4"
-    if video_file.exists():
-        # Store the relative path for direct loading
-        team_videos[row['Tm']] = f"Videos/{row['VideoKey']}.mp4"
-    else:
-        team_videos[row['Tm']] = None
-
-
-plotly_html = fig.to_html(config={'staticPlot': False}, include_plotlyjs=True)
-
-team_wins_json = json.dumps(dict(zip(df['Tm'], df['Chmp'])))
-
-container_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8" />
-    <style>
-        body {{
+team_videos = {team: team_assets(team).get("clip") for team in df['Tm']}
+
+
+team_wins_json = dump_json(dict(zip(df['Tm'], df['Chmp'])))
+
+# --- Knob lookup table ---
+# index.html maps the phone's acceleration norm to a championship count
+# (largest one <= the scaled norm) and then to the first bar with that
+# count. Precomputed here per KNOB_STEP bucket of the norm, so each phone
+# message is one array index plus at most one comparison.
+# A bucket holds at most one count threshold (they are 40/13 norm apart).
+# Thresholds are placed exactly (fractions, not float quantization), and
+# the browser decides the side with the original comparison
+# champEquivalent >= level, so the result matches the old mapping exactly.
+KNOB_NORM = (10.0, 50.0)  # norms outside are clamped; phone.html sends peaks shifted so its shake threshold lands on 10
+KNOB_STEP = 0.25
+MAX_WINS = 13
+
+
+def bar_lookup(chmp):
+    chmp = np.asarray(chmp)
+    lo, hi = KNOB_NORM
+    levels, first_bar = np.unique(chmp, return_index=True)
+    levels, first_bar = levels.tolist(), first_bar.tolist()
+    step = Fraction(KNOB_STEP)
+    # Norm where each count starts: champEquivalent == level
+    starts = [Fraction(lo) + Fraction(level) * (Fraction(hi) - Fraction(lo)) / MAX_WINS for level in levels]
+    # A float floor() can put a norm next to a bucket edge in the neighbouring
+    # bucket, so each bucket also covers a sliver of its neighbours
+    slack = step / 1000
+
+    below, cut_level, at = [], [], []
+    for k in range(int((Fraction(hi) - Fraction(lo)) / step) + 1):
+        left = Fraction(lo) + k * step - slack
+        right = Fraction(lo) + (k + 1) * step + slack
+        inside = [i for i, start in enumerate(starts) if left <= start < right]
+        assert len(inside) <= 1, "KNOB_STEP too coarse for the championship levels"
+        # Largest level that starts before the bucket (no level: first bar)
+        before = [i for i, start in enumerate(starts) if start < left]
+        base = first_bar[before[-1]] if before else 0
+        below.append(base)
+        if inside:
+            cut_level.append(levels[inside[0]])
+            at.append(first_bar[inside[0]])
+        else:
+            cut_level.append(0)  # champEquivalent >= 0 always: keeps base
+            at.append(base)
+    return {
+        "minNorm": lo,
+        "maxNorm": hi,
+        "maxWins": MAX_WINS,
+        "step": KNOB_STEP,
+        "bar": below,
+        "level": cut_level,
+        "barAt": at,
+        "champ": chmp.tolist(),
+        "volume": np.clip(chmp / MAX_WINS, 0.1, 1.0).round(4).tolist(),
+    }
+
+
+bar_lookup_json = dump_json(bar_lookup(df['Chmp']))
+
+# --- Cheer tiers ---
+# Audio/sprites.py writes one trimmed, loudness-normalized cheer per
+# championship bucket (a few KB each) and a map of them, which goes into the
+# page. Without it the engine plays the full MP3 at a per-team volume.
+CHEER_MAP = Path("Audio/cheers.json")
+
+
+def cheer_sprites():
+    if not CHEER_MAP.exists():
+        return None
+    sprites = json.loads(CHEER_MAP.read_text(encoding="utf-8"))
+    for tier in sprites["tiers"]:
+        tier["files"] = {codec: f"{CHEER_MAP.parent.as_posix()}/{name}" for codec, name in tier["files"].items()}
+    return sprites
+
+
+cheer_sprites_json = dump_json(cheer_sprites())
+
+PAGE_CSS = """
+        body {
             margin: 0;
             padding: 20px;
             display: flex;
@@ -127,102 +164,299 @@ container_html = f"""<!DOCTYPE html>
             min-height: 100vh;
             background-color: #f5f5f5;
             font-family: Arial, sans-serif;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background-color: white;
             border-radius: 8px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
             padding: 20px;
             max-width: 100%;
             overflow: hidden;
-        }}
-    </style>
-</head>
-<body>
-    <div class="chart-container">
-        {plotly_html}
-        <audio id="CrowdAudio" controls>
-            <source src="Audio/CheeringSFX.mp3" type="audio/mpeg">
-        </audio>
-    </div>
+        }
+"""
+
+# --- Web Audio engine for the cheer ---
+# Each file is decoded once into an AudioBuffer; every cheer is a new buffer
+# source with its own gain node, so cheers overlap instead of restarting one
+# <audio> element. At most MAX_VOICES play at once; a new cheer beyond that
+# fades out the oldest one. Tier files are fetched one after another, the
+# quietest first, so the first cheer only waits for that one small file; a
+# tier that is not decoded yet plays the loudest decoded tier below it.
+CHEER_ENGINE_JS = """
+window.CheerEngine = (function() {
+    var MAX_VOICES = 6;
+    var FADE = 0.015;  // s, time constant for stolen voices
+
+    var AudioCtx = window.AudioContext || window.webkitAudioContext;
+    var ctx = null, master = null, loading = null;
+    var buffers = [];  // decoded files, in load() order
+    var voices = [];  // oldest first
+
+    function context() {
+        if (!ctx && AudioCtx) {
+            ctx = new AudioCtx({ latencyHint: "interactive" });
+            master = ctx.createGain();
+            master.connect(ctx.destination);
+        }
+        return ctx;
+    }
+
+    // The context starts suspended until the page gets a user gesture
+    function unlock() {
+        if (ctx && ctx.state === "suspended") ctx.resume();
+    }
+    ["pointerdown", "keydown", "touchstart"].forEach(function(type) {
+        window.addEventListener(type, unlock, { capture: true, passive: true });
+    });
+
+    function decode(url) {
+        return fetch(url)
+            .then(function(r) { return r.arrayBuffer(); })
+            .then(function(data) {
+                // Callback form for older Safari
+                return new Promise(function(resolve, reject) { ctx.decodeAudioData(data, resolve, reject); });
+            });
+    }
+
+    // urls: one file, or the tier files quietest first
+    function load(urls) {
+        if (!loading && context()) {
+            loading = [].concat(urls).reduce(function(chain, url, i) {
+                return chain.then(function() {
+                    return decode(url).then(function(decoded) { buffers[i] = decoded; });
+                });
+            }, Promise.resolve())
+                .catch(function(err) { console.warn("Cheer audio not decoded, using <audio>:", err); });
+        }
+        return loading;
+    }
+
+    function release(voice, when) {
+        voice.gain.gain.setTargetAtTime(0, when, FADE);
+        voice.source.stop(when + FADE * 5);
+    }
+
+    // Returns false when nothing is decoded yet (caller may fall back)
+    function play(volume, index) {
+        var i = index || 0;
+        while (i > 0 && !buffers[i]) i--;
+        var buffer = buffers[i];
+        if (!buffer) return false;
+        unlock();
+        var now = ctx.currentTime;
+        while (voices.length >= MAX_VOICES) release(voices.shift(), now);
+
+        var source = ctx.createBufferSource();
+        source.buffer = buffer;
+        var gain = ctx.createGain();
+        gain.gain.value = volume;
+        source.connect(gain);
+        gain.connect(master);
+
+        var voice = { source: source, gain: gain };
+        source.onended = function() {
+            var i = voices.indexOf(voice);
+            if (i >= 0) voices.splice(i, 1);
+            gain.disconnect();
+        };
+        source.start(now);
+        voices.push(voice);
+        return true;
+    }
+
+    return { load: load, play: play, voices: function() { return voices.length; } };
+})();
+"""
+
+CROWD_JS = """
+    document.addEventListener("DOMContentLoaded", function() {
 
-    <script>
-    document.addEventListener("DOMContentLoaded", function() {{
-
-        var audio   = document.getElementById("CrowdAudio");
         var graphDiv = document.querySelector(".plotly-graph-div");
 
         // Diccionario equipo → championships
-        var teamWins = {team_wins_json};
+        var teamWins = window.teamWins;
+
+        // Decodificamos el audio una vez; mientras tanto se usa un <audio>.
+        // Si existen los tiers (Audio/sprites.py) cargamos esos, el más
+        // suave primero: Opus donde el navegador lo soporta, si no AAC
+        var CLIP = "Audio/CheeringSFX.mp3";
+        var cheers = window.CheerEngine;
+        var sprites = window.cheerSprites;
+        var codec = document.createElement("audio").canPlayType('audio/webm; codecs="opus"') ? "opus" : "aac";
+        var urls = sprites ? sprites.tiers.map(function(t) { return t.files[codec]; }) : [CLIP];
+        cheers.load(urls);
+
+        // Tier según los championships del equipo
+        function tierFor(wins) {
+            for (var i = sprites.tiers.length - 1; i > 0; i--) {
+                if (wins >= sprites.tiers[i].min) return i;
+            }
+            return 0;
+        }
+
+        // Sin Web Audio (o antes de decodificar): un <audio> por archivo
+        var fallback = {};
+        function playFallback(url, volume) {
+            var el = fallback[url] || (fallback[url] = new Audio(url));
+            el.volume = volume;
+            el.currentTime = 0;
+            el.play();
+        }
 
         // ----------------------------
         //  función interna
         // ----------------------------
-        function playCrowdForTeam(team) {{
+        function playCrowdForTeam(team, volume) {
             var wins = teamWins[team] || 0;
-            var maxWins = 13;
-
-            var volume = wins / maxWins;
-            volume = Math.max(0.1, Math.min(volume, 1.0));
-
-            audio.volume = volume;
-            audio.currentTime = 0;
-            audio.play();
-        }}
+            if (volume === undefined) {
+                var maxWins = 13;
+                volume = Math.max(0.1, Math.min(wins / maxWins, 1.0));
+            }
+
+            if (sprites) {
+                // La sonoridad ya viene en cada tier
+                var tier = tierFor(wins);
+                if (!cheers.play(1, tier)) playFallback(urls[tier], 1);
+                return;
+            }
+            if (!cheers.play(volume)) playFallback(CLIP, volume);
+        }
 
         // ----------------------------------------------------------
-        // FUNCIÓN GLOBAL accesible desde index.html:
-        // Llama audio + hover real sobre la barra correspondiente
+        // Selección de barra: las ráfagas de mensajes del teléfono se
+        // juntan en una actualización por frame, y solo se repintan las
+        // barras que cambian (la anterior y la nueva)
         // ----------------------------------------------------------
-        window.playCrowdForIndex = function(idx) {{
-
-            console.log("🔊 playCrowdForIndex llamada con idx =", idx);
+        var baseColor     = "mediumseagreen";
+        var selectedColor = "orange";
+        var colors = null;      // copia cacheada de marker.color
+        var shownIdx = -1;      // barra pintada ahora
+        var pendingIdx = -1;    // última barra pedida
+        var frame = 0;
+        var syncTimer = 0;
+
+        // Las barras se buscan una vez; Plotly las recrea al redibujar
+        // (zoom, resize, restyle), así que refrescamos la lista en afterplot
+        var points = null;
+
+        function barPath(idx) {
+            if (!points) points = graphDiv.querySelectorAll(".trace.bars .point");
+            return points[idx] ? points[idx].querySelector("path") : null;
+        }
+
+        if (graphDiv && graphDiv.on) {
+            graphDiv.on("plotly_afterplot", function() { points = null; });
+        }
+
+        function paintBar(idx, color) {
+            colors[idx] = color;
+            var path = barPath(idx);
+            if (path) path.style.fill = color;
+        }
+
+        function applySelection() {
+            frame = 0;
+            var idx = pendingIdx;
+            if (idx === shownIdx) return;
+
+            // 1) Colorear solo las dos barras que cambian
+            if (shownIdx >= 0) paintBar(shownIdx, baseColor);
+            paintBar(idx, selectedColor);
+            shownIdx = idx;
+
+            // 2) (Opcional) Hover visual, una vez por cambio
+            if (window.Plotly && Plotly.Fx && typeof Plotly.Fx.hover === "function") {
+                Plotly.Fx.hover(graphDiv, {
+                    curveNumber: 0,
+                    pointNumber: idx
+                });
+            }
 
-            if (!graphDiv || !graphDiv.data || !graphDiv.data[0]) return;
+            // Cuando la ráfaga termina, dejamos los colores en la figura para
+            // que un redibujado de Plotly (zoom, resize) conserve la selección
+            clearTimeout(syncTimer);
+            syncTimer = setTimeout(function() {
+                if (window.Plotly) Plotly.restyle(graphDiv, { "marker.color": [colors.slice()] }, [0]);
+            }, 300);
+        }
 
-            var data  = graphDiv.data[0];
-            var teams = data.y;
+        // Pide seleccionar la barra; devuelve el equipo (o null)
+        function selectBar(idx) {
+            if (!graphDiv || !graphDiv.data || !graphDiv.data[0]) return null;
 
-            if (!teams || idx < 0 || idx >= teams.length) return;
+            var teams = graphDiv.data[0].y;
 
-            var team = teams[idx];
+            if (!teams || idx < 0 || idx >= teams.length) return null;
 
-            // ===============================
-            // 1) Colorear la barra seleccionada
-            // ===============================
-            var n = teams.length;
-            var baseColor     = "mediumseagreen";
-            var selectedColor = "orange";
+            if (!colors) colors = new Array(teams.length).fill(baseColor);
+            pendingIdx = idx;
+            if (!frame) frame = requestAnimationFrame(applySelection);
+            return teams[idx];
+        }
 
-            // Creamos un array de colores: todos verdes salvo la elegida
-            var colors = new Array(n).fill(baseColor);
-            colors[idx] = selectedColor;
+        // ----------------------------------------------------------
+        // FUNCIÓN GLOBAL accesible desde index.html:
+        // Llama audio + hover real sobre la barra correspondiente
+        // ----------------------------------------------------------
+        window.playCrowdForIndex = function(idx) {
 
-            if (window.Plotly) {{
-                Plotly.restyle(graphDiv, {{ "marker.color": [colors] }}, [0]);
-            }}
+            console.log("🔊 playCrowdForIndex llamada con idx =", idx);
 
-            // ===============================
-            // 2) (Opcional) Hover visual
-            // ===============================
-            if (window.Plotly && Plotly.Fx && typeof Plotly.Fx.hover === "function") {{
-                Plotly.Fx.hover(graphDiv, {{
-                    curveNumber: 0,
-                    pointNumber: idx
-                }});
-            }}
+            var team = selectBar(idx);
+            if (team === null) return;
 
             // ===============================
-            // 3) AUDIO (igual que antes)
+            // 3) AUDIO (volumen precalculado por barra)
             // ===============================
-            playCrowdForTeam(team);
-        }};
+            playCrowdForTeam(team, window.barLookup.volume[idx]);
+        };
 
+        // ----------------------------------------------------------
+        // Handshake con el Knob (index.html): le mandamos la tabla
+        // norma → barra una sola vez, y recibimos selecciones por
+        // postMessage en vez de que lea el DOM del iframe
+        // ----------------------------------------------------------
+        function sendLookup(target) {
+            target.postMessage({ type: "barLookup", lookup: window.barLookup }, "*");
+        }
+
+        window.addEventListener("message", function(ev) {
+            var msg = ev.data;
+            if (!msg) return;
+            if (msg.type === "requestBarLookup" && ev.source) {
+                sendLookup(ev.source);
+            } else if (msg.type === "playCrowdForIndex") {
+                window.playCrowdForIndex(msg.index);
+            } else if (msg.type === "selectBarByIndex") {
+                selectBar(msg.index);  // solo resalta la barra, sin audio
+            }
+        });
+
+        // Por si el Knob pidió la tabla antes de que cargáramos
+        if (window.parent !== window) sendLookup(window.parent);
+
+
+    });
+"""
+
+with PageWriter("NFL_Teams_Chart4.html") as page:
+    page.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    {style_tag(PAGE_CSS, "chart-page")}
+</head>
+<body>
+    <div class="chart-container">
+        """)
+    page.write_figure(fig, "NFL_Teams_Chart4", config={'staticPlot': False})
+    page.write(f"""
+    </div>
 
-    }});
-    </script>
+    {data_script("teamWins", team_wins_json)}
+    {data_script("barLookup", bar_lookup_json)}
+    {data_script("cheerSprites", cheer_sprites_json)}
+    {script_tag(CHEER_ENGINE_JS, "cheer-engine")}
+    {script_tag(CROWD_JS, "crowd-audio")}
 </body>
-</html>"""
-
-with open("NFL_Teams_Chart4.html", "w", encoding="utf-8") as f:
-    f.write(container_html)
+</html>""")
@@ -1,19 +1,16 @@
-import pandas as pd
 import plotly.graph_objects as go
-from PIL import Image
-from pathlib import Path
-import json
+from assets import style_tag
+from page import PageWriter, dump_json
+from team_data import load_teams
+from figure_builder import add_logos
+from media_manifest import team_assets
 
 # ================================
 #   LOAD DATA
 # ================================
-df = pd.read_csv("team_data_pop.csv")
+df = load_teams()
 
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Population'] = df['Population'].astype(float)
-df['Chmp'] = df['Chmp'].astype(float)
-
-df.sort_values(by='Chmp', ascending=True, inplace=True)
+df.sort_values(by='Chmp', ascending=True, kind='stable', inplace=True)
 
 # ================================
 #   BUILD PLOTLY FIGURE
@@ -23,7 +20,7 @@ fig = go.Figure()
 fig.add_trace(go.Bar(
     x=df['Chmp'],
     y=df['Tm'],
-    text=df['Chmp'].astype(str),
+    text=df['Chmp'].astype(float).astype(str),  # labels keep the "13.0" format
     textposition='outside',
     hovertext=df['Tm'],
     hoverinfo='text',
@@ -43,25 +40,6 @@ fig.add_trace(go.Bar(
 # ================================
 #   ADD TEAM LOGOS
 # ================================
-logo_path = Path("NFL_Logos")
-min_logo = 0.1
-max_logo = 0.3
-exp_factor = 2.5  # exaggeration factor
-
-for idx, row in df.iterrows():
-    png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"
-    if png_file.exists():
-        fig.add_layout_image(
-            x=-0.5,
-            y=row['Tm'],
-            source=Image.open(png_file),
-            xref="x",
-            yref="y",
-            sizex=1.3,
-            sizey=1.3,
-            xanchor="center",
-            yanchor="middle",
-        )
 
 # ================================
 #   STYLE
@@ -93,35 +71,21 @@ fig.update_layout(
     hovermode="closest"
 )
 
+# Logos are pre-sized from the final layout
+add_logos(fig, df['Tm'], x=-0.5, y=df['Tm'], sizex=1.3, sizey=1.3)
+
 # ================================
 #   VIDEOS FOR EACH TEAM
 # ================================
-df['VideoKey'] = df['Tm'].apply(lambda x: x.split()[-1])
-
-video_path = Path("Videos")
-team_videos = {}
+team_videos = {team: team_assets(team).get("clip") for team in df['Tm']}
 
-for _, row in df.iterrows():
-    video_file = video_path / f"{row['VideoKey']}.mp4"
-    if video_file.exists():
-        team_videos[row['Tm']] = f"Videos/{row['VideoKey']}.mp4"
-    else:
-        team_videos[row['Tm']] = None
-
-VIDEO_DICT_JSON = json.dumps(team_videos)
+VIDEO_DICT_JSON = dump_json(team_videos)
 
 # ================================
 #   GENERATE HTML
 # ================================
-plotly_html = fig.to_html(include_plotlyjs=True)
-
-container_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8" />
-<style>
-    body {{
+PAGE_CSS = """
+    body {
         margin: 0;
         padding: 20px;
         display: flex;
@@ -129,22 +93,22 @@ container_html = f"""
         align-items: flex-start;
         background-color: #f5f5f5;
         font-family: Arial, sans-serif;
-    }}
-    .chart-container {{
+    }
+    .chart-container {
         background-color: white;
         border-radius: 8px;
         padding: 20px;
         box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    }}
+    }
 
-#hoverVideo {{
+#hoverVideo {
     position: fixed;
     width: 320px;
     border-radius: 10px;
     display: none;
     z-index: 10000;
-}}
-#hoverCaption {{
+}
+#hoverCaption {
     position: fixed;
     background: rgba(0,0,0,0.7);
     color: white;
@@ -156,8 +120,18 @@ container_html = f"""
     z-index: 10001;
     display: none;
     width: 305px;
-}}
-</style>
+}
+"""
+
+# ================================
+#   WRITE HTML FILE
+# ================================
+with PageWriter("NFL_Teams_Chart3.html") as page:
+    page.write(f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8" />
+{style_tag(PAGE_CSS, "bar-page")}
 </head>
 
 <body>
@@ -165,7 +139,9 @@ container_html = f"""
 <div class="chart-container">
 
     <!-- PLOTLY CHART -->
-    {plotly_html}
+    """)
+    page.write_figure(fig, "NFL_Teams_Chart3")
+    page.write("""
     <audio controls>
         <source src="Audio/CheeringSFX.mp3" type="audio/mpeg">
     </audio>
@@ -177,12 +153,6 @@ container_html = f"""
 
 </body>
 </html>
-"""
-
-# ================================
-#   SAVE HTML FILE
-# ================================
-with open("NFL_Teams_Chart3.html", "w", encoding="utf-8") as f:
-    f.write(container_html)
+""")
 
-print("Archivo generado: NFL_Teams_Chart.html")
\ No newline at end of file
+print("Archivo generado: NFL_Teams_Chart.html")
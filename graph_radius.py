@@ -1,16 +1,15 @@
-import pandas as pd
 import plotly.graph_objects as go
-from PIL import Image
-from pathlib import Path
 import numpy as np
+from assets import style_tag
+from page import PageWriter
+from team_data import load_teams
+from figure_builder import add_logos, logo_sprites_script, scatter_trace, arc_offsets, resolve_collisions, win_scale
 
 # Load data
-df = pd.read_csv("team_data_pop.csv")
-df['TV_Homes'] = df['TV_Homes'].astype(float)
-df['Population'] = df['Population'].astype(float)
+df = load_teams()
 
 fig = go.Figure()
-fig.add_trace(go.Scatter(
+fig.add_trace(scatter_trace(
     x=df['TV_Homes'],
     y=df['Chmp'],
     mode='markers',
@@ -19,47 +18,29 @@ fig.add_trace(go.Scatter(
     hoverinfo='text'
 ))
 
-logo_path = Path("NFL_Logos")
 min_logo = 0.1
 max_logo = 0.3
 exp_factor = 2.5  # tweak between 2–3 for more exaggeration
 
-# Precompute normalization for win-loss
-win_min = df["W-L%.1"].min()
-win_max = df["W-L%.1"].max()
+# Scaled logo size (exaggerated by power)
+scale = win_scale(df["W-L%.1"], min_logo, max_logo, exp_factor)
 
 # --- Clustered displacement by championship level ---
-grouped = df.groupby('Chmp')
+# spread teams evenly across a small horizontal arc (small vertical offset)
+radius = df['TV_Homes'].max() * 0.03  # controls how far apart horizontally
+offset_x, offset_y = arc_offsets(df['Chmp'], radius, y_radius=0.2)
 
-for _, group in grouped:
-    # spread teams evenly across a small horizontal arc
-    angles = np.linspace(-np.pi/4, np.pi/4, len(group))
-    radius = df['TV_Homes'].max() * 0.03  # controls how far apart horizontally
-
-    for (idx, row), angle in zip(group.iterrows(), angles):
-        png_file = logo_path / f"{row['Tm'].lower().replace(' ', '')}.png"
-        if not png_file.exists():
-            continue
-
-        # Scaled logo size (exaggerated by power)
-        normalized = (row["W-L%.1"] - win_min) / (win_max - win_min)
-        scale = min_logo + (normalized ** exp_factor) * (max_logo - min_logo)
-
-        # Apply consistent offset to avoid overlap for same Chmp
-        offset_x = np.cos(angle) * radius
-        offset_y = np.sin(angle) * 0.2  # small vertical offset
-
-        fig.add_layout_image(
-            x=row['TV_Homes'] + offset_x,
-            y=row['Chmp'] + offset_y,
-            source=Image.open(png_file),
-            xref="x",
-            yref="y",
-            sizex=scale * df['TV_Homes'].max(),
-            sizey=scale * df['Chmp'].max(),
-            xanchor="center",
-            yanchor="middle",
-        )
+# The arc ignores logo size and other groups; push the remaining overlaps
+# apart (each logo moves at most half its size, and stays within 0.4
+# championships of its value including the arc's own vertical offset)
+push_x, push_y = resolve_collisions(
+    df['TV_Homes'] + offset_x,
+    df['Chmp'] + offset_y,
+    scale * df['TV_Homes'].max(),
+    scale * df['Chmp'].max(),
+    max_dy=0.4 - np.abs(offset_y),
+)
+offset_x, offset_y = offset_x + push_x, offset_y + push_y
 
 # --- Layout and HTML output ---
 fig.update_layout(
@@ -90,14 +71,20 @@ fig.update_layout(
    margin=dict(l=80, r=50, t=120, b=80)
 )
 
-plotly_html = fig.to_html(config={'staticPlot': False}, include_plotlyjs=True)
+# Logos are pre-sized from the final layout, drawn grouped by championship level
+order = np.argsort(df['Chmp'].to_numpy(), kind='stable')
+add_logos(
+    fig,
+    df['Tm'].to_numpy()[order],
+    x=(df['TV_Homes'] + offset_x).to_numpy()[order],
+    y=(df['Chmp'] + offset_y).to_numpy()[order],
+    sizex=(scale * df['TV_Homes'].max())[order],
+    sizey=(scale * df['Chmp'].max())[order],
+    sprites=True,
+)
 
-container_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8" />
-    <style>
-        body {{
+PAGE_CSS = """
+        body {
             margin: 0;
             padding: 20px;
             display: flex;
@@ -106,23 +93,30 @@ container_html = f"""<!DOCTYPE html>
             min-height: 100vh;
             background-color: #f5f5f5;
             font-family: Arial, sans-serif;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background-color: white;
             border-radius: 8px;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
             padding: 20px;
             max-width: 100%;
             overflow: hidden;
-        }}
-    </style>
+        }
+"""
+
+with PageWriter("NFL_Teams_Chart.html") as page:
+    page.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    {style_tag(PAGE_CSS, "chart-page")}
 </head>
 <body>
     <div class="chart-container">
-        {plotly_html}
+        """)
+    page.write_figure(fig, "NFL_Teams_Chart", config={'staticPlot': False})
+    page.write(f"""
     </div>
+    {logo_sprites_script(fig)}
 </body>
-</html>"""
-
-with open("NFL_Teams_Chart.html", "w", encoding="utf-8") as f:
-    f.write(container_html)
+</html>""")
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import math
+import os
+from pathlib import Path
+
+from PIL import Image, features
+
+CACHE_DIR = Path(".cache") / "logos"
+
+# Render at 2x the drawn size so logos stay sharp on HiDPI screens
+PIXEL_RATIO = 2
+# Round boxes up to this step so nearby sizes share one variant
+SIZE_STEP = 16
+
+FORMAT = "webp" if features.check("webp") else "png"
+MIME = {"webp": "image/webp", "png": "image/png"}
+
+_uri_memo = {}
+
+
+def _bucket(px):
+    return max(SIZE_STEP, int(math.ceil(px * PIXEL_RATIO / SIZE_STEP)) * SIZE_STEP)
+
+
+def _trimmed(png_file):
+    img = Image.open(png_file).convert("RGBA")
+    bbox = img.getchannel("A").getbbox()
+    return img.crop(bbox) if bbox else img
+
+
+def _encode(img, fmt, out_file):
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = out_file.with_name(f"{out_file.name}.{os.getpid()}.tmp")
+    if fmt == "webp":
+        img.save(tmp_file, format="WEBP", quality=90, method=6)
+    else:
+        img.save(tmp_file, format="PNG", optimize=True)
+    tmp_file.replace(out_file)
+
+
+def logo_variant(png_file, box_px, fmt=FORMAT):
+    """Path to a trimmed logo downscaled to fit box_px=(w, h) screen pixels.
+
+    Variants are keyed by the source PNG's content hash, so an unchanged logo
+    is never decoded or re-encoded again.
+    """
+    digest = hashlib.sha1(Path(png_file).read_bytes()).hexdigest()[:16]
+    w, h = (_bucket(px) for px in box_px)
+    out_file = CACHE_DIR / f"{digest}_{w}x{h}.{fmt}"
+    if not out_file.exists():
+        img = _trimmed(png_file)
+        img.thumbnail((w, h), Image.LANCZOS)
+        _encode(img, fmt, out_file)
+    return out_file
+
+
+def logo_atlas(png_files, box_px, fmt=FORMAT):
+    """One image holding every logo side by side, plus each logo's [x, y, w, h] in it.
+
+    Each cell is the logo variant for box_px, so the atlas is built from
+    small cached images and only re-encoded when one of them changes.
+    """
+    variants = [logo_variant(png_file, box_px, fmt) for png_file in png_files]
+    digest = hashlib.sha1("\n".join(v.name for v in variants).encode("utf-8")).hexdigest()[:16]
+    out_file = CACHE_DIR / f"atlas_{digest}.{fmt}"
+
+    images = [Image.open(v) for v in variants]
+    cell_w = max((img.width for img in images), default=1)
+    cell_h = max((img.height for img in images), default=1)
+    cols = max(1, math.ceil(math.sqrt(len(images))))
+    rects = [[(i % cols) * cell_w, (i // cols) * cell_h, img.width, img.height] for i, img in enumerate(images)]
+    if not out_file.exists():
+        sheet = Image.new("RGBA", (cell_w * cols, cell_h * max(1, math.ceil(len(images) / cols))))
+        for (x, y, _w, _h), img in zip(rects, images):
+            sheet.paste(img.convert("RGBA"), (x, y))
+        _encode(sheet, fmt, out_file)
+    return out_file, rects
+
+
+def data_uri(out_file):
+    out_file = Path(out_file)
+    if out_file not in _uri_memo:
+        encoded = base64.b64encode(out_file.read_bytes()).decode("ascii")
+        _uri_memo[out_file] = f"data:{MIME[out_file.suffix.lstrip('.')]};base64,{encoded}"
+    return _uri_memo[out_file]
+
+
+def logo_data_uri(png_file, box_px, fmt=FORMAT):
+    return data_uri(logo_variant(png_file, box_px, fmt))
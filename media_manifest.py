@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from PIL import Image
+
+try:
+    import ffmpeg
+except ImportError:  # optional, clips are listed without duration/size
+    ffmpeg = None
+
+MANIFEST = Path("media_manifest.json")
+LOGO_DIR = Path("NFL_Logos")
+VIDEO_DIR = Path("Videos")
+
+# Clip names that are not the last word of the team name
+ALIASES = {"Niners": "49ers"}
+# Sources, not team clips
+SKIP = {"full_video", "test_video"}
+
+# role: (glob under Videos/, suffix stripped from the stem)
+CLIP_ROLES = {
+    "clip": ("*.mp4", ""),
+    "hover": ("web/*.mp4", ""),
+    "hover_low": ("web/*.low.mp4", ".low"),
+    "poster": ("posters/*.webp", ""),
+    "strip": ("posters/*_strip.webp", "_strip"),
+}
+
+MIME = {".png": "image/png", ".webp": "image/webp", ".mp4": "video/mp4"}
+
+_loaded = {}
+
+
+def logo_name(team):
+    return f"{team.lower().replace(' ', '')}.png"
+
+
+def clip_key(team):
+    """Key shared by a team and its clips: "San Francisco 49ers" -> "49ers"."""
+    return team.split()[-1]
+
+
+def _sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _probe_video(path):
+    if ffmpeg is None:
+        return {}
+    try:
+        _out, err = ffmpeg.input(str(path)).output("-", format="null", t=0).run(capture_stderr=True)
+    except (FileNotFoundError, ffmpeg.Error):  # no ffmpeg binary, or an unreadable clip
+        return {}
+    log = err.decode("utf-8", "replace")
+    info = {}
+    duration = re.search(r"Duration: (\d+):(\d+):([\d.]+)", log)
+    if duration:
+        h, m, s = duration.groups()
+        info["duration"] = round(int(h) * 3600 + int(m) * 60 + float(s), 3)
+    size = re.search(r"Video: .*?, (\d{2,5})x(\d{2,5})", log)
+    if size:
+        info["width"], info["height"] = map(int, size.groups())
+    info["audio"] = "Audio:" in log.split("Output #0")[0]
+    return info
+
+
+def _file_entry(path, previous):
+    stat = path.stat()
+    old = previous.get(path.as_posix())
+    # Unchanged files keep their hash and probe results
+    if old and old["bytes"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+        return old
+    entry = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": _sha1(path),
+             "type": MIME.get(path.suffix, "application/octet-stream")}
+    if path.suffix == ".mp4":
+        entry.update(_probe_video(path))
+    else:
+        with Image.open(path) as img:
+            entry["width"], entry["height"] = img.size
+    return entry
+
+
+def build_manifest(teams, path=MANIFEST):
+    """Scan NFL_Logos/ and Videos/ once and write the team -> asset index."""
+    try:
+        previous = json.loads(Path(path).read_text(encoding="utf-8"))["files"]
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    by_role = {role: {} for role in CLIP_ROLES}
+    unmatched = []
+    keys = {clip_key(team) for team in teams}
+    for role, (pattern, suffix) in CLIP_ROLES.items():
+        for clip in sorted(VIDEO_DIR.glob(pattern)):
+            stem = clip.stem
+            if suffix:
+                stem = stem[:-len(suffix)]
+            elif stem.endswith((".low", "_strip")):
+                continue  # belongs to the suffixed role
+            if stem in SKIP:
+                continue
+            key = ALIASES.get(stem, stem)
+            if key in keys:
+                by_role[role][key] = clip.as_posix()
+            else:
+                unmatched.append(clip.as_posix())
+
+    logos = {p.name: p.as_posix() for p in LOGO_DIR.glob("*.png")}
+    team_entries = {}
+    for team in teams:
+        entry = {"logo": logos.get(logo_name(team))}
+        for role in CLIP_ROLES:
+            entry[role] = by_role[role].get(clip_key(team))
+        team_entries[team] = entry
+
+    used = sorted({p for entry in team_entries.values() for p in entry.values() if p})
+    manifest = {
+        "teams": team_entries,
+        "files": {p: _file_entry(Path(p), previous) for p in used},
+        "unmatched": unmatched,
+    }
+    tmp_file = Path(path).with_name(f"{Path(path).name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    tmp_file.replace(path)
+    return manifest
+
+
+def load_manifest(path=MANIFEST):
+    """The manifest written by build_manifest (built on first use if missing)."""
+    path = Path(path)
+    if path not in _loaded:
+        if not path.exists():
+            from team_data import load_teams
+            build_manifest(load_teams()["Tm"], path)
+        _loaded[path] = json.loads(path.read_text(encoding="utf-8"))
+    return _loaded[path]
+
+
+def team_assets(team):
+    """{"logo", "clip", "hover", "hover_low", "poster", "strip"} paths (None when absent)."""
+    return load_manifest()["teams"].get(team, {})
+
+
+def file_info(path):
+    return load_manifest()["files"].get(path, {})
+
+
+# Browser side: fetch the same manifest and warm the small assets (posters)
+# once the page is idle, so the first hover has something to show. This is
+# the only poster warm-up; pages don't add <link rel=preload> for them too.
+PRELOAD_JS = """
+(function () {
+    var idle = window.requestIdleCallback || function (cb) { return setTimeout(cb, 200); };
+    window.mediaManifest = fetch('media_manifest.json')
+        .then(function (r) { return r.ok ? r.json() : null; })
+        .catch(function () { return null; });
+    window.mediaManifest.then(function (manifest) {
+        if (!manifest) return;
+        idle(function () {
+            Object.keys(manifest.teams).forEach(function (team) {
+                var poster = manifest.teams[team].poster;
+                if (poster) { new Image().src = poster; }
+            });
+        });
+    });
+})();
+"""
+
+
+if __name__ == "__main__":
+    from team_data import load_teams
+
+    manifest = build_manifest(load_teams()["Tm"])
+    for p in manifest["unmatched"]:
+        print(f"Warning: {p} does not match any team (add it to ALIASES?)")
+    missing = [t for t, e in manifest["teams"].items() if not e["logo"]]
+    if missing:
+        print(f"Warning: no logo for {', '.join(missing)}")
+    print(f"Wrote {MANIFEST} ({len(manifest['files'])} files)")
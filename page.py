@@ -0,0 +1,152 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+import plotly
+from plotly.io.json import to_json_plotly
+
+from assets import copy_asset, external_assets
+
+try:
+    import brotli
+except ImportError:  # optional, only needed for .br output
+    brotli = None
+
+PLOTLY_JS = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+CHUNK_SIZE = 1 << 16
+
+
+def dump_json(obj):
+    # Sorted keys keep embedded payloads independent of row/dict order
+    return json.dumps(obj, sort_keys=True)
+
+
+def _compress_formats():
+    # NFL_COMPRESS=gzip,br also writes page.html.gz / page.html.br alongside
+    return [fmt for fmt in os.environ.get("NFL_COMPRESS", "").split(",") if fmt]
+
+
+class _GzipSink:
+    def __init__(self, path):
+        # mtime=0 and no filename keep the .gz bytes reproducible
+        self._raw = open(path, "wb")
+        self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0, compresslevel=9)
+
+    def write(self, data):
+        self._gzip.write(data)
+
+    def close(self):
+        self._gzip.close()
+        self._raw.close()
+
+
+class _BrotliSink:
+    def __init__(self, path):
+        if brotli is None:
+            raise RuntimeError("brotli output requested but the brotli package is not installed")
+        self._file = open(path, "wb")
+        self._compressor = brotli.Compressor(quality=11)
+
+    def write(self, data):
+        self._file.write(self._compressor.process(data))
+
+    def close(self):
+        self._file.write(self._compressor.finish())
+        self._file.close()
+
+
+class PageWriter:
+    """Write a chart page section by section straight to disk.
+
+    Nothing holds the whole page in memory: plotly.js is copied from the
+    package file in chunks and the figure JSON is written one trace / one
+    layout image at a time. Optional .gz/.br copies are written in the same
+    pass. Output is byte-stable for identical inputs.
+    """
+
+    def __init__(self, path, compress=None):
+        self.path = Path(path)
+        self._sinks = [open(self.path, "wb")]
+        for fmt in _compress_formats() if compress is None else compress:
+            if fmt == "gzip":
+                self._sinks.append(_GzipSink(f"{self.path}.gz"))
+            elif fmt == "br":
+                self._sinks.append(_BrotliSink(f"{self.path}.br"))
+            else:
+                raise ValueError(f"unknown compression format: {fmt}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+        self._sinks = []
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        for sink in self._sinks:
+            sink.write(data)
+
+    def write_file(self, path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                for sink in self._sinks:
+                    sink.write(chunk)
+
+    def write_plotlyjs(self):
+        self.write("<script>window.PlotlyConfig = {MathJaxConfig: 'local'};</script>\n")
+        if external_assets():
+            self.write(f'<script charset="utf-8" src="{copy_asset(PLOTLY_JS)}"></script>')
+        else:
+            self.write('<script charset="utf-8" type="text/javascript">')
+            self.write_file(PLOTLY_JS)
+            self.write("</script>")
+
+    def write_figure(self, fig, page, config=None, include_plotlyjs=True):
+        """Same markup as fig.to_html(full_html=False), with a stable div id."""
+        fig_dict = fig.to_dict()
+        layout = fig_dict.get("layout", {})
+        div_id = f"chart-{page}"
+        config = dict(config or {})
+        config.setdefault("responsive", True)
+        width = f"{layout['width']}px" if "width" in layout else "100%"
+        height = f"{layout['height']}px" if "height" in layout else "100%"
+
+        self.write(f'<div style="height:{height}; width:{width};">')
+        if include_plotlyjs:
+            self.write_plotlyjs()
+        self.write(
+            f'<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>'
+            "<script>window.PLOTLYENV=window.PLOTLYENV || {};"
+            f'if (document.getElementById("{div_id}")) {{Plotly.newPlot("{div_id}",'
+        )
+        self._write_json_list(fig_dict.get("data", []))
+        self.write(",")
+        self._write_layout(layout)
+        self.write(f",{json.dumps(config)})}};</script></div>")
+
+    def _write_json_list(self, items):
+        self.write("[")
+        for i, item in enumerate(items):
+            if i:
+                self.write(",")
+            self.write(to_json_plotly(item))
+        self.write("]")
+
+    def _write_layout(self, layout):
+        self.write("{")
+        for i, (key, value) in enumerate(layout.items()):
+            if i:
+                self.write(",")
+            self.write(json.dumps(key) + ":")
+            if key == "images":
+                self._write_json_list(value)
+            else:
+                self.write(to_json_plotly(value))
+        self.write("}")
+
@@ -0,0 +1,48 @@
+import gzip
+import os
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional, .br variants are skipped without it
+    brotli = None
+
+# Text assets only; images, video and audio are already compressed
+PATTERNS = ["*.html", "media_manifest.json", "dist/assets/*.js", "dist/assets/*.css", "dist/assets/*.html", "dist/assets/*.json"]
+MIN_SIZE = 1024
+
+
+def _write(path, data):
+    tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(data)
+    tmp_file.replace(path)
+
+
+def _stale(src, dst):
+    return not dst.exists() or dst.stat().st_mtime_ns < src.stat().st_mtime_ns
+
+
+def precompress(root="."):
+    """Write .gz (and .br when brotli is installed) next to every text asset."""
+    root = Path(root)
+    written = 0
+    for pattern in PATTERNS:
+        for src in sorted(root.glob(pattern)):
+            if src.stat().st_size < MIN_SIZE:
+                continue
+            data = None
+            gz = src.with_name(src.name + ".gz")
+            if _stale(src, gz):
+                data = src.read_bytes()
+                _write(gz, gzip.compress(data, compresslevel=9, mtime=0))
+                written += 1
+            br = src.with_name(src.name + ".br")
+            if brotli is not None and _stale(src, br):
+                data = data if data is not None else src.read_bytes()
+                _write(br, brotli.compress(data, quality=11))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    print(f"Precompressed {precompress()} files")
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import hashlib
+import mimetypes
+import re
+from email.utils import formatdate
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+ROOT = Path(__file__).resolve().parent
+
+# Files under dist/assets/ (or named like logo.0123456789ab.webp) never change
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+CHUNK_SIZE = 1 << 16
+IDLE_TIMEOUT = 15  # seconds a keep-alive connection may wait for its next request
+
+# Only the built site is served, not the scripts, data or backlog next to it.
+# Patterns match one path segment per "/" ("*" never crosses directories).
+SITE_FILES = [
+    "*.html", "config.js", "media_manifest.json",
+    "Interaction/*.html", "Interaction/config.js",
+    "dist/assets/*",
+    "NFL_Logos/*.png",
+    "Videos/*.mp4", "Videos/web/*.mp4", "Videos/posters/*.webp",
+    "Audio/*.mp3", "Audio/cheers-*.webm", "Audio/cheers-*.m4a",
+]
+# Sources under a served pattern that no page loads
+NOT_SERVED = {"Videos/full_video.mp4", "Videos/test_video.mp4"}
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("video/mp4", ".mp4")
+mimetypes.add_type("text/javascript", ".js")
+
+_etags = {}
+
+
+def is_site_file(rel):
+    parts = rel.split("/")
+    return rel not in NOT_SERVED and any(
+        len(pattern_parts) == len(parts) and all(fnmatch(p, q) for p, q in zip(parts, pattern_parts))
+        for pattern_parts in (pattern.split("/") for pattern in SITE_FILES)
+    )
+
+
+def etag(path):
+    """Strong ETag from the file content, cached per (mtime, size)."""
+    stat = path.stat()
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _etags:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _etags[key] = f'"{h.hexdigest()[:20]}"'
+    return _etags[key]
+
+
+def parse_range(header, size):
+    """(start, end) for a single "bytes=" range, None if absent/unsupported, or "invalid"."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return "invalid"
+    return start, end
+
+
+class StaticServer:
+    def __init__(self, root=ROOT):
+        self.root = Path(root).resolve()
+
+    def resolve(self, target):
+        rel = unquote(urlsplit(target).path).lstrip("/") or "index.html"
+        if any(part.startswith(".") for part in rel.split("/")):
+            return None  # .cache/, .git/ ...
+        path = (self.root / rel).resolve()
+        if self.root not in path.parents and path != self.root:
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_file() or not is_site_file(path.relative_to(self.root).as_posix()):
+            return None
+        return path
+
+    def cache_control(self, path):
+        rel = path.relative_to(self.root).as_posix()
+        if rel.startswith("dist/assets/") or HASHED_NAME.search(path.name):
+            return IMMUTABLE
+        return REVALIDATE
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    # Header block larger than the stream limit (64 KiB)
+                    await self.send_status(writer, 431, False)
+                    break
+                lines = request.decode("latin-1").split("\r\n")
+                method, target, _version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.respond(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, method, target, headers, keep_alive):
+        if method not in ("GET", "HEAD"):
+            return await self.send_status(writer, 405, keep_alive, {"Allow": "GET, HEAD"})
+        path = self.resolve(target)
+        if path is None:
+            return await self.send_status(writer, 404, keep_alive)
+
+        response = {
+            "Content-Type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            "Cache-Control": self.cache_control(path),
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+
+        # Serve a precompressed variant when the client accepts it (never for ranges)
+        body = path
+        accepted = {e.split(";")[0].strip() for e in headers.get("accept-encoding", "").split(",")}
+        if "range" not in headers:
+            for encoding, suffix in ENCODINGS:
+                variant = path.with_name(path.name + suffix)
+                if encoding in accepted and variant.is_file():
+                    body = variant
+                    response["Content-Encoding"] = encoding
+                    break
+
+        tag = etag(body)
+        response["ETag"] = tag
+        response["Last-Modified"] = formatdate(path.stat().st_mtime, usegmt=True)
+        if tag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            return await self.send_status(writer, 304, keep_alive, response, body=False)
+
+        size = body.stat().st_size
+        status, start, end = 200, 0, size - 1
+        byte_range = parse_range(headers["range"], size) if "range" in headers else None
+        if byte_range is not None and headers.get("if-range", tag) != tag:
+            byte_range = None  # resource changed, send it whole
+        if byte_range == "invalid":
+            response["Content-Range"] = f"bytes */{size}"
+            return await self.send_status(writer, 416, keep_alive, response)
+        if byte_range is not None:
+            status, (start, end) = 206, byte_range
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        response["Content-Length"] = str(end - start + 1)
+        await self.send_head(writer, status, response)
+        if method == "GET" and size:
+            with open(body, "rb") as f:
+                try:
+                    await asyncio.get_running_loop().sendfile(writer.transport, f, start, end - start + 1)
+                except NotImplementedError:
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining:
+                        chunk = f.read(min(CHUNK_SIZE, remaining))
+                        writer.write(chunk)
+                        remaining -= len(chunk)
+                        await writer.drain()
+        await writer.drain()
+
+    async def send_head(self, writer, status, headers):
+        reason = {200: "OK", 206: "Partial Content", 304: "Not Modified", 404: "Not Found",
+                  405: "Method Not Allowed", 416: "Range Not Satisfiable",
+                  431: "Request Header Fields Too Large"}[status]
+        lines = [f"HTTP/1.1 {status} {reason}"] + [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def send_status(self, writer, status, keep_alive, headers=None, body=True):
+        headers = dict(headers or {})
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        if body:
+            headers["Content-Length"] = "0"
+        else:
+            headers.pop("Content-Length", None)
+        await self.send_head(writer, status, headers)
+        await writer.drain()
+
+
+async def serve(host, port, root=ROOT):
+    server = StaticServer(root)
+    async with await asyncio.start_server(server.handle, host, port) as srv:
+        print(f"Serving {server.root} on http://{host}:{port}/")
+        await srv.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static server for the generated chart site.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--root", default=str(ROOT))
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.root))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CSV_PATH = Path("team_data_pop.csv")
+CACHE_DIR = Path(".cache")
+
+# Only the columns the charts actually read
+COLUMNS = ["Tm", "From", "W-L%.1", "Chmp", "Conf", "City", "TV_Homes", "Share", "Population"]
+CATEGORICAL = ["Tm", "City", "Conf"]
+INTEGER = ["From", "Chmp"]
+FLOAT = ["W-L%.1", "TV_Homes", "Population"]
+
+
+def _csv_digest(csv_path):
+    return hashlib.sha1(Path(csv_path).read_bytes()).hexdigest()[:16]
+
+
+def _parse_csv(csv_path):
+    df = pd.read_csv(csv_path, usecols=COLUMNS, dtype={"Tm": str, "City": str, "Conf": str, "Share": str})
+    df = df[COLUMNS]
+
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    for col in INTEGER:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in FLOAT:
+        df[col] = df[col].astype(float)
+
+    # "1.972%" -> 1.972
+    df["Share"] = df["Share"].str.rstrip("%").astype(float)
+    return df
+
+
+def _save_npz(df, cache_file):
+    arrays = {}
+    for col in COLUMNS:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[f"{col}__codes"] = series.cat.codes.to_numpy()
+            arrays[f"{col}__categories"] = np.asarray(series.cat.categories, dtype=str)
+        else:
+            arrays[col] = series.to_numpy()
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f"{cache_file.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp_file, **arrays)
+    tmp_file.replace(cache_file)
+
+
+def _load_npz(cache_file):
+    with np.load(cache_file, allow_pickle=False) as arrays:
+        data = {}
+        for col in COLUMNS:
+            if col in CATEGORICAL:
+                data[col] = pd.Categorical.from_codes(
+                    arrays[f"{col}__codes"], categories=arrays[f"{col}__categories"].tolist()
+                )
+            else:
+                data[col] = arrays[col]
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def load_teams(csv_path=CSV_PATH, use_cache=True):
+    """Load the typed team table, reusing the .npz cache when the CSV is unchanged."""
+    if not use_cache:
+        return _parse_csv(csv_path)
+
+    cache_file = CACHE_DIR / f"team_data_{_csv_digest(csv_path)}.npz"
+    if cache_file.exists():
+        try:
+            return _load_npz(cache_file)
+        except (OSError, KeyError, ValueError):
+            pass  # corrupt or outdated cache, rebuild below
+
+    df = _parse_csv(csv_path)
+    for stale in CACHE_DIR.glob("team_data_*.npz"):
+        if stale != cache_file and ".tmp" not in stale.name:
+            stale.unlink(missing_ok=True)
+    _save_npz(df, cache_file)
+    return df